@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Benchmark extract_image.py against synthetic Codex session rollouts."""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+IMAGE_HEADERS: dict[str, bytes] = {
+    "png": b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR",
+    "jpg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+    "webp": b"RIFF\x00\x00\x00\x00WEBPVP8 ",
+}
+
+# Characters str.splitlines() treats as line breaks that json.dumps writes
+# raw; extract_image.py has to survive them sitting next to the payload.
+# (The other splitlines() breaks, \x0b \x0c \x1c-\x1e, are control
+# characters, so JSON always escapes them and they never reach a rollout.)
+UNICODE_LINE_BREAKS = "\u0085\u2028\u2029"
+
+FILLER_WORDS = (
+    "imagegen", "session", "rollout", "שלום", "עליזה", "prompt", "tool_call",
+    "assistant", "reasoning", "token", "context", "עיצוב",
+)
+
+
+def make_image_bytes(fmt: str, size: int, rng: random.Random) -> bytes:
+    """Return ``size`` bytes starting with the real magic header for ``fmt``."""
+    header = IMAGE_HEADERS[fmt]
+    return header + rng.randbytes(max(0, size - len(header)))
+
+
+def _filler_text(rng: random.Random, length: int) -> str:
+    words: list[str] = []
+    total = 0
+    while total < length:
+        word = rng.choice(FILLER_WORDS)
+        if rng.random() < 0.05:
+            word += rng.choice(UNICODE_LINE_BREAKS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def write_synthetic_rollout(
+    path: pathlib.Path,
+    *,
+    size_bytes: int,
+    lines: int,
+    images: int,
+    image_bytes: int,
+    formats: list[str],
+    seed: int = 0,
+) -> dict:
+    """Write a rollout JSONL of roughly ``size_bytes`` and describe it.
+
+    ``images`` payload records are spread evenly between ``lines`` filler
+    records whose text is padded to reach the target size. The largest
+    payload is always the last one, so the expected winner is known.
+    """
+    rng = random.Random(seed)
+    image_sizes = sorted(
+        image_bytes - rng.randrange(max(1, image_bytes // 4)) for _ in range(images)
+    )
+    if image_sizes:
+        image_sizes[-1] = image_bytes
+    payload_chars = sum(4 * ((n + 2) // 3) for n in image_sizes)
+    filler_len = max(16, (size_bytes - payload_chars) // max(1, lines) - 160)
+    image_every = max(1, lines // max(1, images))
+
+    expected: dict | None = None
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        pending = list(image_sizes)
+        for i in range(lines):
+            record = {
+                "timestamp": f"2025-01-15T08:00:{i % 60:02d}.000Z",
+                "type": "response_item",
+                "payload": {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": _filler_text(rng, filler_len)}],
+                },
+            }
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if pending and (i + 1) % image_every == 0:
+                fmt = formats[len(pending) % len(formats)]
+                decoded_bytes = pending.pop(0)
+                blob = base64.b64encode(make_image_bytes(fmt, decoded_bytes, rng)).decode()
+                record = {
+                    "type": "response_item",
+                    "payload": {
+                        "type": "image_generation_call",
+                        "status": "completed",
+                        "revised_prompt": _filler_text(rng, 80),
+                        "result": blob,
+                    },
+                }
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if not pending:
+                    expected = {"format": fmt, "length": len(blob), "decoded_bytes": decoded_bytes}
+    return {
+        "path": str(path),
+        "bytes": path.stat().st_size,
+        "lines": lines,
+        "images": images,
+        "image_bytes": image_bytes,
+        "formats": formats,
+        "seed": seed,
+        "expected": expected,
+    }
+
+
+def _peak_rss_bytes(children: bool = False) -> int | None:
+    """Peak RSS of this process, or of its largest finished child process."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    ).ru_maxrss
+    # ru_maxrss is KiB on Linux but bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(case: dict) -> dict:
+    """Run one timed case; executed in a fresh process so peak RSS is its own."""
+    import extract_image
+
+    paths = [pathlib.Path(p) for p in case["session_paths"]]
+    started = time.perf_counter()
+    if case["target"] == "find_best_image_blob":
+        result = extract_image.find_best_image_blob(
+            paths, scanner=case["scanner"], workers=case["workers"]
+        )
+        found = None if result is None else {"format": result[1], "length": len(result[0])}
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            list_file = pathlib.Path(tmp) / "sessions.txt"
+            list_file.write_text("\n".join(case["session_paths"]) + "\n")
+            argv = [
+                "extract_image.py",
+                str(pathlib.Path(tmp) / "out.png"),
+                str(list_file),
+                "--scanner", case["scanner"],
+            ]
+            if case["scanner"] == "mmap":
+                argv += ["--workers", str(case["workers"])]
+            with contextlib.redirect_stdout(io.StringIO()):
+                rc = extract_image.main(argv)
+            out_path = pathlib.Path(tmp) / "out.png"
+            found = {
+                "exit_code": rc,
+                "decoded_bytes": out_path.stat().st_size if out_path.exists() else None,
+            }
+    wall = time.perf_counter() - started
+    return {
+        "wall_seconds": wall,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        # --workers > 1 scans in pool processes, which have exited by now
+        "peak_child_rss_bytes": _peak_rss_bytes(children=True),
+        "found": found,
+    }
+
+
+def matches_expected(target: str, expected: dict | None, found: dict | None) -> bool:
+    """True if a run found the payload ``write_synthetic_rollout`` said would win."""
+    if target == "find_best_image_blob":
+        if expected is None:
+            return found is None
+        return found == {"format": expected["format"], "length": expected["length"]}
+    if expected is None:
+        return found["exit_code"] == 1
+    return found["exit_code"] == 0 and found["decoded_bytes"] == expected["decoded_bytes"]
+
+
+def run_case(case: dict, repeat: int) -> dict:
+    """Run ``case`` ``repeat`` times, each in its own spawned process."""
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs.append(pool.submit(_run_case, case).result())
+    walls = [run["wall_seconds"] for run in runs]
+    rss = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"] is not None]
+    child_rss = [
+        run["peak_child_rss_bytes"] for run in runs if run["peak_child_rss_bytes"] is not None
+    ]
+    best = min(walls)
+    return {
+        **{k: v for k, v in case.items() if k != "session_paths"},
+        "repeat": repeat,
+        "wall_seconds_min": best,
+        "wall_seconds_median": statistics.median(walls),
+        "peak_rss_bytes": max(rss) if rss else None,
+        "peak_child_rss_bytes": max(child_rss) if child_rss else None,
+        "throughput_mb_s": case["input_bytes"] / best / 1e6 if best > 0 else None,
+        "found": runs[-1]["found"],
+        "matches_expected": all(
+            matches_expected(case["target"], case["expected"], run["found"]) for run in runs
+        ),
+    }
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bench_extract_image.py",
+        description="Time extract_image.py on synthetic rollouts and write JSON results.",
+    )
+    parser.add_argument("--output", default="bench_extract_image.json",
+                        help="where to write results (default: %(default)s)")
+    parser.add_argument("--size-mb", type=float, default=64.0,
+                        help="approximate size of each rollout")
+    parser.add_argument("--files", type=positive_int, default=1, help="rollouts to generate")
+    parser.add_argument("--lines", type=positive_int, default=2000, help="filler records per rollout")
+    parser.add_argument("--images", type=int, default=3, help="image payloads per rollout")
+    parser.add_argument("--image-kb", type=positive_int, default=1536, help="decoded size of the largest image")
+    parser.add_argument("--formats", default="png,jpg,webp",
+                        help="comma-separated payload formats to rotate through")
+    parser.add_argument("--scanners", default="mmap,json", help="comma-separated scanners to time")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the mmap scanner")
+    parser.add_argument("--repeat", type=positive_int, default=3, help="runs per case; min and median are reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", metavar="DIR",
+                        help="write the synthetic rollouts to DIR and keep them")
+    return parser
+
+
+def main(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv[1:])
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = sorted(set(formats) - set(IMAGE_HEADERS))
+    if unknown:
+        print(f"unknown formats: {unknown}", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_dir = pathlib.Path(args.keep or tmp)
+        fixture_dir.mkdir(parents=True, exist_ok=True)
+        fixtures = [
+            write_synthetic_rollout(
+                fixture_dir / f"rollout-synthetic-{n:03d}.jsonl",
+                size_bytes=int(args.size_mb * 1024 * 1024),
+                lines=args.lines,
+                images=args.images,
+                image_bytes=args.image_kb * 1024,
+                formats=formats,
+                seed=args.seed + n,
+            )
+            for n in range(args.files)
+        ]
+        session_paths = [f["path"] for f in fixtures]
+        input_bytes = sum(f["bytes"] for f in fixtures)
+        expected = max(
+            (f["expected"] for f in fixtures if f["expected"] is not None),
+            key=lambda e: e["length"],
+            default=None,
+        )
+
+        results = []
+        for target in ("find_best_image_blob", "main"):
+            for scanner in [s for s in args.scanners.split(",") if s]:
+                case = {
+                    "target": target,
+                    "scanner": scanner,
+                    "workers": args.workers if scanner == "mmap" else 1,
+                    "input_bytes": input_bytes,
+                    "expected": expected,
+                    "session_paths": session_paths,
+                }
+                result = run_case(case, args.repeat)
+                results.append(result)
+                print(
+                    f"{target:<22} {scanner:<5} "
+                    f"{result['wall_seconds_min'] * 1000:9.1f} ms  "
+                    f"{(result['throughput_mb_s'] or 0):8.1f} MB/s  "
+                    f"peak RSS {(result['peak_rss_bytes'] or 0) / 1e6:8.1f} MB "
+                    f"(workers {(result['peak_child_rss_bytes'] or 0) / 1e6:.1f} MB)"
+                    + ("" if result["matches_expected"] else "  MISMATCH"),
+                    file=sys.stderr,
+                )
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fixtures": [{k: v for k, v in f.items() if k != "path"} for f in fixtures],
+        "results": results,
+    }
+    pathlib.Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(args.output)
+    mismatched = [r for r in results if not r["matches_expected"]]
+    for result in mismatched:
+        print(
+            f"{result['target']} ({result['scanner']}) found {result['found']}, "
+            f"expected {result['expected']}",
+            file=sys.stderr,
+        )
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
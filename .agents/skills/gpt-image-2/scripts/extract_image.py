@@ -3,11 +3,21 @@
 
 from __future__ import annotations
 
+import argparse
 import base64
+import hashlib
 import json
+import mmap
+import os
 import pathlib
 import re
 import sys
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import NamedTuple
 
 IMAGE_MAGIC_PREFIXES: dict[str, str] = {
     "iVBORw0KGgo": "png",
@@ -16,35 +26,387 @@ IMAGE_MAGIC_PREFIXES: dict[str, str] = {
 }
 
 MIN_BLOB_LENGTH = 200
+# Base64 characters decoded per write; a multiple of 4 so every chunk but
+# the last decodes without padding.
+DECODE_CHUNK_SIZE = 4 * 256 * 1024
 BASE64_BLOB_PATTERN = re.compile(r'"([A-Za-z0-9+/=]{' + str(MIN_BLOB_LENGTH) + r',})"')
 
 
-def find_best_image_blob(session_paths: list[pathlib.Path]) -> tuple[str, str] | None:
-    """Return the largest (base64, ext) image payload found across given files."""
-    best: tuple[str, str, int] | None = None
-    for session_path in session_paths:
+BASE64_RUN_PATTERN = re.compile(rb"[A-Za-z0-9+/=]*")
+
+SCANNERS: tuple[str, ...] = ("mmap", "json")
+
+# Window size for tail-first scanning; only the pages of each window are
+# faulted in from the mapped file.
+TAIL_BLOCK_SIZE = 4 * 1024 * 1024
+
+INDEX_MAX_ENTRIES = 512
+# Bytes hashed just before an index entry's resume point, to notice a file
+# that was rewritten rather than appended to.
+INDEX_TAIL_WINDOW = 4096
+
+
+class ImageCandidate(NamedTuple):
+    """Location of a base64 image payload inside a rollout file."""
+
+    path: pathlib.Path
+    offset: int
+    length: int
+    ext: str
+
+
+def _iter_json_blobs(session_path: pathlib.Path):
+    """Yield (base64, ext) payloads by re-serialising every JSONL record."""
+    try:
+        text = session_path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return
+    # Split on \n only. Do NOT use str.splitlines(): it also breaks on
+    # Unicode line boundaries (NEL U+0085, LS U+2028, etc.), which can
+    # appear mid-payload and shatter the giant single-line JSON, losing
+    # the base64 image. Reading as UTF-8 (not the Windows locale codepage)
+    # is also required so multibyte bytes aren't mis-decoded.
+    for line in text.split("\n"):
         try:
-            text = session_path.read_text(encoding="utf-8", errors="replace")
-        except OSError:
+            obj = json.loads(line)
+        except ValueError:
             continue
-        # Split on \n only. Do NOT use str.splitlines(): it also breaks on
-        # Unicode line boundaries (NEL U+0085, LS U+2028, etc.), which can
-        # appear mid-payload and shatter the giant single-line JSON, losing
-        # the base64 image. Reading as UTF-8 (not the Windows locale codepage)
-        # is also required so multibyte bytes aren't mis-decoded.
-        for line in text.split("\n"):
-            try:
-                obj = json.loads(line)
-            except ValueError:
-                continue
-            flat = json.dumps(obj)
-            for match in BASE64_BLOB_PATTERN.finditer(flat):
-                blob = match.group(1)
-                for magic, ext in IMAGE_MAGIC_PREFIXES.items():
-                    if blob.startswith(magic):
-                        if best is None or len(blob) > best[2]:
-                            best = (blob, ext, len(blob))
-                        break
+        flat = json.dumps(obj)
+        for match in BASE64_BLOB_PATTERN.finditer(flat):
+            blob = match.group(1)
+            for magic, ext in IMAGE_MAGIC_PREFIXES.items():
+                if blob.startswith(magic):
+                    yield blob, ext
+                    break
+
+
+def scan_rollout_mmap(session_path: pathlib.Path) -> ImageCandidate | None:
+    """Locate the largest image payload in a rollout by scanning its raw bytes.
+
+    The file is memory-mapped and searched for ``"<magic>`` directly; the end
+    of each base64 run is found with a bytes regex, so no per-line strings or
+    JSON objects are built. Rollouts are written by serde_json, which never
+    escapes ``/`` or ASCII letters, so every payload the JSON parser would
+    find appears verbatim in the raw bytes. Working on bytes also sidesteps
+    the Unicode line-boundary caveat in ``_iter_json_blobs``. Unlike the JSON
+    scanner, payloads on a malformed (e.g. still being written) line are kept.
+    """
+    try:
+        with open(session_path, "rb") as fh:
+            if fh.seek(0, 2) == 0:
+                return None
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _scan_buffer(buf, session_path)
+    except (OSError, ValueError):
+        return None
+
+
+def _find_hits(buf, start: int = 0) -> list[tuple[int, int, str]]:
+    """Return (offset, length, ext) of every image payload in buf, in file order."""
+    hits: list[tuple[int, int, str]] = []
+    for magic, ext in IMAGE_MAGIC_PREFIXES.items():
+        needle = b'"' + magic.encode("ascii")
+        pos = buf.find(needle, start)
+        while pos != -1:
+            run = BASE64_RUN_PATTERN.match(buf, pos + 1)
+            end = run.end()
+            if end - (pos + 1) >= MIN_BLOB_LENGTH and buf[end:end + 1] == b'"':
+                hits.append((pos + 1, end - (pos + 1), ext))
+            pos = buf.find(needle, end)
+    hits.sort()
+    return hits
+
+
+def _scan_buffer(
+    buf, session_path: pathlib.Path, start: int = 0
+) -> ImageCandidate | None:
+    best: ImageCandidate | None = None
+    # Visit hits in file order so ties resolve to the earliest payload, the
+    # same way the JSON scanner's strict ">" comparison does.
+    for offset, length, ext in _find_hits(buf, start):
+        if best is None or length > best.length:
+            best = ImageCandidate(session_path, offset, length, ext)
+    return best
+
+
+def scan_rollout_tail(
+    session_path: pathlib.Path, min_length: int, block_size: int = TAIL_BLOCK_SIZE
+) -> ImageCandidate | None:
+    """Locate an image payload by walking the rollout backward from its end.
+
+    Windows of ``block_size`` bytes are searched from the end of the file
+    towards the start; the first window holding a complete payload of at
+    least ``min_length`` base64 characters ends the search, and its largest
+    such payload is returned. If none qualifies, the full forward scan's
+    result is returned instead.
+    """
+    try:
+        with open(session_path, "rb") as fh:
+            if fh.seek(0, 2) == 0:
+                return None
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                hi = len(buf)
+                while hi > 0:
+                    lo = max(0, hi - block_size)
+                    best: ImageCandidate | None = None
+                    for magic, ext in IMAGE_MAGIC_PREFIXES.items():
+                        needle = b'"' + magic.encode("ascii")
+                        # Let a needle that starts in this window run past hi.
+                        stop = min(len(buf), hi + len(needle) - 1)
+                        pos = buf.find(needle, lo, stop)
+                        while pos != -1:
+                            end = BASE64_RUN_PATTERN.match(buf, pos + 1).end()
+                            length = end - (pos + 1)
+                            if (
+                                length >= max(min_length, MIN_BLOB_LENGTH)
+                                and buf[end:end + 1] == b'"'
+                                and (
+                                    best is None
+                                    or length > best.length
+                                    or (length == best.length and pos + 1 < best.offset)
+                                )
+                            ):
+                                best = ImageCandidate(session_path, pos + 1, length, ext)
+                            pos = buf.find(needle, pos + 1, stop)
+                    if best is not None:
+                        return best
+                    hi = lo
+                return _scan_buffer(buf, session_path)
+    except (OSError, ValueError):
+        return None
+
+
+def iter_image_candidates(session_path: pathlib.Path) -> Iterator[ImageCandidate]:
+    """Yield every image payload in a rollout, in file order."""
+    try:
+        with open(session_path, "rb") as fh:
+            if fh.seek(0, 2) == 0:
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                hits = _find_hits(buf)
+    except (OSError, ValueError):
+        return
+    for offset, length, ext in hits:
+        yield ImageCandidate(session_path, offset, length, ext)
+
+
+def _tail_digest(buf, end: int) -> str:
+    return hashlib.blake2b(
+        buf[max(0, end - INDEX_TAIL_WINDOW):end], digest_size=16
+    ).hexdigest()
+
+
+def scan_rollout_incremental(
+    session_path: pathlib.Path, entry: dict | None
+) -> tuple[ImageCandidate | None, dict | None]:
+    """Scan a rollout using (and refreshing) its ScanIndex entry.
+
+    An unchanged file is answered from ``entry`` without opening it. A file
+    that only grew is scanned from ``entry["scanned_to"]``, the start of the
+    line that was last seen incomplete, so a payload that was still being
+    written is picked up whole. Anything else is scanned from byte 0.
+    Returns ``(None, None)`` when the file cannot be read.
+    """
+    try:
+        stat = session_path.stat()
+    except OSError:
+        return None, None
+
+    def candidate_from(data: dict | None) -> ImageCandidate | None:
+        if data is None:
+            return None
+        return ImageCandidate(session_path, data["offset"], data["length"], data["ext"])
+
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return candidate_from(entry["best"]), entry
+
+    new_entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "scanned_to": 0,
+        "tail_digest": "",
+        "best": None,
+    }
+    if stat.st_size == 0:
+        return None, new_entry
+    try:
+        with open(session_path, "rb") as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            prior: ImageCandidate | None = None
+            start = 0
+            if (
+                entry
+                and len(buf) >= entry["scanned_to"]
+                and _tail_digest(buf, entry["scanned_to"]) == entry["tail_digest"]
+            ):
+                prior = candidate_from(entry["best"])
+                start = entry["scanned_to"]
+            found = _scan_buffer(buf, session_path, start)
+            best = prior
+            if found is not None and (best is None or found.length > best.length):
+                best = found
+            new_entry["scanned_to"] = buf.rfind(b"\n") + 1
+            new_entry["tail_digest"] = _tail_digest(buf, new_entry["scanned_to"])
+    except (OSError, ValueError):
+        return None, None
+    if best is not None:
+        new_entry["best"] = {"offset": best.offset, "length": best.length, "ext": best.ext}
+    return best, new_entry
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _valid_index_entry(entry) -> bool:
+    """True if ``entry`` has the shape ``scan_rollout_incremental`` writes."""
+    if not isinstance(entry, dict):
+        return False
+    if not all(
+        _is_int(entry.get(field)) and entry[field] >= 0
+        for field in ("size", "mtime_ns", "scanned_to")
+    ):
+        return False
+    if not isinstance(entry.get("tail_digest"), str):
+        return False
+    last_used = entry.get("last_used")
+    if not (_is_int(last_used) or isinstance(last_used, float)):
+        return False
+    best = entry.get("best")
+    if best is None:
+        return "best" in entry
+    return (
+        isinstance(best, dict)
+        and _is_int(best.get("offset"))
+        and _is_int(best.get("length"))
+        and isinstance(best.get("ext"), str)
+    )
+
+
+class ScanIndex:
+    """JSON sidecar remembering each rollout's size, mtime and best payload.
+
+    Keyed by resolved path. Only the ``max_entries`` most recently used
+    entries are kept when saving, so the sidecar cannot grow without bound.
+    A missing or unreadable sidecar simply starts empty, and malformed
+    entries in a readable one are dropped (those files are rescanned).
+    """
+
+    def __init__(self, path: pathlib.Path, max_entries: int = INDEX_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: dict[str, dict] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and isinstance(data.get("files"), dict):
+            self.entries = {
+                key: entry
+                for key, entry in data["files"].items()
+                if _valid_index_entry(entry)
+            }
+
+    @staticmethod
+    def key(session_path: pathlib.Path) -> str:
+        return str(session_path.expanduser().resolve())
+
+    def lookup(self, session_path: pathlib.Path) -> dict | None:
+        return self.entries.get(self.key(session_path))
+
+    def store(self, session_path: pathlib.Path, entry: dict | None) -> None:
+        key = self.key(session_path)
+        if entry is None:
+            self.entries.pop(key, None)
+            return
+        self.entries[key] = {**entry, "last_used": time.time()}
+
+    def save(self) -> None:
+        keep = sorted(
+            self.entries.items(), key=lambda item: item[1]["last_used"], reverse=True
+        )[:self.max_entries]
+        self.entries = dict(keep)
+        payload = json.dumps({"version": 1, "files": self.entries}, indent=1)
+        write_atomically(self.path, [payload.encode("utf-8")])
+
+
+def find_best_image_candidate(
+    session_paths: list[pathlib.Path],
+    workers: int = 1,
+    index: ScanIndex | None = None,
+    tail_min_length: int | None = None,
+) -> ImageCandidate | None:
+    """Return the location of the largest image payload across given files.
+
+    With ``workers > 1`` the rollouts are scanned in a process pool. Workers
+    only send back the small ``ImageCandidate`` tuple, never the blob, and
+    results are merged in ``session_paths`` order so ties resolve the same
+    way as a serial scan. With an ``index``, unchanged files are skipped and
+    grown files are scanned from where the last run stopped; the caller is
+    responsible for ``index.save()``. With ``tail_min_length`` (ignored when
+    an index is given), each file is scanned with ``scan_rollout_tail``.
+    """
+    workers = min(workers, len(session_paths))
+    if index is None:
+        scan = (
+            scan_rollout_mmap
+            if tail_min_length is None
+            else partial(scan_rollout_tail, min_length=tail_min_length)
+        )
+        jobs = (session_paths,)
+    else:
+        scan = scan_rollout_incremental
+        jobs = (session_paths, [index.lookup(path) for path in session_paths])
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(scan, *jobs))
+    else:
+        results = list(map(scan, *jobs))
+
+    if index is None:
+        candidates = results
+    else:
+        candidates = []
+        for path, (candidate, entry) in zip(session_paths, results):
+            index.store(path, entry)
+            candidates.append(candidate)
+
+    best: ImageCandidate | None = None
+    for candidate in candidates:
+        if candidate is not None and (best is None or candidate.length > best.length):
+            best = candidate
+    return best
+
+
+def read_candidate(candidate: ImageCandidate) -> str:
+    """Read the base64 text of a located payload back from its rollout."""
+    with open(candidate.path, "rb") as fh:
+        fh.seek(candidate.offset)
+        return fh.read(candidate.length).decode("ascii")
+
+
+def find_best_image_blob(
+    session_paths: list[pathlib.Path], scanner: str = "mmap", workers: int = 1
+) -> tuple[str, str] | None:
+    """Return the largest (base64, ext) image payload found across given files.
+
+    ``scanner="json"`` keeps the original parse-and-reserialise path as a
+    reference implementation; ``"mmap"`` scans raw bytes instead and is the
+    only scanner that honours ``workers``.
+    """
+    if scanner == "mmap":
+        candidate = find_best_image_candidate(session_paths, workers=workers)
+        if candidate is None:
+            return None
+        return read_candidate(candidate), candidate.ext
+    if scanner != "json":
+        raise ValueError(f"unknown scanner {scanner!r}; expected one of {SCANNERS}")
+
+    best: tuple[str, str, int] | None = None
+    for session_path in session_paths:
+        for blob, ext in _iter_json_blobs(session_path):
+            if best is None or len(blob) > best[2]:
+                best = (blob, ext, len(blob))
     if best is None:
         return None
     return best[0], best[1]
@@ -86,36 +448,215 @@ def validate_output_path(raw_out: str) -> pathlib.Path:
     return resolved
 
 
+def iter_decoded_chunks(
+    candidate: ImageCandidate, chunk_size: int = DECODE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield the decoded image in pieces, reading base64 straight from the rollout."""
+    if chunk_size <= 0 or chunk_size % 4:
+        raise ValueError(f"chunk_size must be a positive multiple of 4; got {chunk_size}")
+    with open(candidate.path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            end = candidate.offset + candidate.length
+            for start in range(candidate.offset, end, chunk_size):
+                yield base64.b64decode(buf[start:min(start + chunk_size, end)])
+
+
+def _write_temp(out_path: pathlib.Path, chunks: Iterable[bytes], digest=None) -> str:
+    """Stream chunks into a temp file beside out_path and return its name.
+
+    When given, ``digest`` (a hashlib object) is updated with every chunk.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=out_path.parent, prefix=f".{out_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+        # mkstemp creates the file 0600; match what a plain open() would give.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_name, 0o666 & ~umask)
+    except BaseException:
+        pathlib.Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return tmp_name
+
+
+def write_atomically(out_path: pathlib.Path, chunks: Iterable[bytes]) -> None:
+    """Stream chunks into a temp file beside out_path, then rename it into place."""
+    tmp_name = _write_temp(out_path, chunks)
+    try:
+        os.replace(tmp_name, out_path)
+    except BaseException:
+        pathlib.Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def extract_all_images(
+    session_paths: list[pathlib.Path], out_path: pathlib.Path
+) -> list[dict]:
+    """Write every distinct image payload to ``<stem>-NNN.<ext>`` beside out_path.
+
+    Each payload is decoded in chunks into a temp file while its SHA-256 is
+    computed; a payload whose decoded content was already written, or that is
+    not valid base64, is discarded. Returns one manifest record per written
+    image.
+    """
+    manifest: list[dict] = []
+    seen: set[str] = set()
+    for session_path in session_paths:
+        for candidate in iter_image_candidates(session_path):
+            digest = hashlib.sha256()
+            try:
+                tmp_name = _write_temp(out_path, iter_decoded_chunks(candidate), digest)
+            except ValueError as err:  # binascii.Error; the temp file is already gone
+                print(
+                    f"skipping undecodable payload at {candidate.path}:{candidate.offset}: {err}",
+                    file=sys.stderr,
+                )
+                continue
+            sha256 = digest.hexdigest()
+            if sha256 in seen:
+                pathlib.Path(tmp_name).unlink(missing_ok=True)
+                continue
+            seen.add(sha256)
+            target = out_path.with_name(
+                f"{out_path.stem}-{len(manifest) + 1:03d}.{candidate.ext}"
+            )
+            os.replace(tmp_name, target)
+            manifest.append({
+                "path": str(target),
+                "source": str(candidate.path),
+                "offset": candidate.offset,
+                "format": candidate.ext,
+                "size": target.stat().st_size,
+                "sha256": sha256,
+            })
+    return manifest
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="extract_image.py",
+        description="Decode the largest generated image found in Codex session rollouts.",
+    )
+    parser.add_argument("out_path")
+    parser.add_argument("sessions_list_file")
+    parser.add_argument(
+        "--scanner",
+        choices=SCANNERS,
+        default="mmap",
+        help="mmap: scan raw bytes (default); json: parse every JSONL record",
+    )
+    parser.add_argument(
+        "--workers",
+        type=non_negative_int,
+        help="scan rollouts in N processes (mmap scanner only; default 1, 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="PATH",
+        help="JSON sidecar used to skip rollouts scanned before (mmap scanner only)",
+    )
+    parser.add_argument(
+        "--index-max-entries",
+        type=non_negative_int,
+        default=INDEX_MAX_ENTRIES,
+        help=f"most recently used rollouts kept in --index (default {INDEX_MAX_ENTRIES})",
+    )
+    parser.add_argument(
+        "--tail-first",
+        type=non_negative_int,
+        metavar="MIN_LENGTH",
+        help=(
+            "scan each rollout backward and stop at the first payload of at "
+            "least MIN_LENGTH base64 characters (mmap scanner only)"
+        ),
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help=(
+            "write every distinct image as <out_stem>-NNN.<ext> plus a "
+            "<out_stem>.manifest.json describing them"
+        ),
+    )
+    return parser
+
+
 def main(argv: list[str]) -> int:
-    if len(argv) != 3:
-        print(
-            "usage: extract_image.py <out_path> <sessions_list_file>",
-            file=sys.stderr,
-        )
-        return 2
+    parser = build_parser()
+    args = parser.parse_args(argv[1:])
+    if args.tail_first is not None and (args.index or args.all or args.scanner == "json"):
+        parser.error("--tail-first cannot be combined with --index, --all or --scanner json")
+    if args.scanner == "json" and (args.workers is not None or args.index):
+        parser.error("--workers and --index need the mmap scanner")
+    if args.all and (args.scanner == "json" or args.workers is not None or args.index):
+        parser.error("--all cannot be combined with --scanner json, --workers or --index")
 
     try:
-        out_path = validate_output_path(argv[1])
+        out_path = validate_output_path(args.out_path)
     except ValueError as err:
         print(f"invalid output path: {err}", file=sys.stderr)
         return 2
 
-    sessions_list_path = pathlib.Path(argv[2])
+    sessions_list_path = pathlib.Path(args.sessions_list_file)
     session_paths = [
         pathlib.Path(line)
         for line in sessions_list_path.read_text().splitlines()
         if line.strip()
     ]
 
-    result = find_best_image_blob(session_paths)
-    if result is None:
+    if args.all:
+        manifest = extract_all_images(session_paths, out_path)
+        if not manifest:
+            print("IMAGE_NOT_FOUND_IN_SESSION", file=sys.stderr)
+            return 1
+        manifest_path = out_path.with_suffix(".manifest.json")
+        write_atomically(
+            manifest_path,
+            [json.dumps({"images": manifest}, indent=2).encode("utf-8")],
+        )
+        for record in manifest:
+            print(record["path"])
+        print(manifest_path)
+        return 0
+
+    if args.scanner == "mmap":
+        workers = 1 if args.workers is None else args.workers or (os.cpu_count() or 1)
+        index = (
+            ScanIndex(pathlib.Path(args.index), args.index_max_entries)
+            if args.index
+            else None
+        )
+        candidate = find_best_image_candidate(
+            session_paths,
+            workers=workers,
+            index=index,
+            tail_min_length=args.tail_first,
+        )
+        if index is not None:
+            index.save()
+        chunks = None if candidate is None else iter_decoded_chunks(candidate)
+    else:
+        result = find_best_image_blob(session_paths, scanner="json")
+        chunks = None if result is None else [base64.b64decode(result[0])]
+    if chunks is None:
         print("IMAGE_NOT_FOUND_IN_SESSION", file=sys.stderr)
         return 1
 
-    blob, _ext = result
-    image_bytes = base64.b64decode(blob)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(image_bytes)
+    write_atomically(out_path, chunks)
     print(out_path)
     return 0
 
@@ -4,8 +4,10 @@ Script to add mock journal data for ענבל (inbald@sapir.ac.il)
 This script adds 15 diverse journal entries with various symptoms, moods, and sleep quality.
 """
 
+import argparse
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 import random
 
@@ -13,12 +15,16 @@ import random
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
+    import httpx
+    from postgrest.exceptions import APIError
     from supabase import create_client, Client
     from dotenv import load_dotenv
 except ImportError:
     print("Please install required packages: pip install supabase python-dotenv")
     sys.exit(1)
 
+from seed_checkpoint import ON_CONFLICT, SeedCheckpoint, entries_fingerprint
+
 # Load environment variables
 load_dotenv()
 
@@ -33,28 +39,187 @@ if not url or not key:
 
 supabase: Client = create_client(url, key)
 
+# Auth user lookup defaults
+USER_PAGE_SIZE = 1000
+USER_INDEX_TTL_SECONDS = 300
+
+# Batched insert defaults
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+# Failures worth retrying; anything else (duplicate key, bad request, ...)
+# fails the same way every time
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+# PostgREST: database unreachable / schema cache not loaded (answered with 503)
+RETRYABLE_POSTGREST_CODES = frozenset({'PGRST000', 'PGRST001', 'PGRST002'})
+# SQLSTATE classes: connection exception, transaction rollback (serialization
+# failure, deadlock), insufficient resources, operator intervention (timeouts)
+RETRYABLE_SQLSTATE_CLASSES = ('08', '40', '53', '57')
+
+class UserIndex:
+    """Email -> user id index built by paging through auth users once.
+
+    The index is rebuilt when it is older than ttl_seconds, so repeated and
+    batch lookups cost one pass over list_users instead of one per email.
+    """
+
+    def __init__(self, client=None, per_page=USER_PAGE_SIZE, ttl_seconds=USER_INDEX_TTL_SECONDS):
+        self.client = client or supabase
+        self.per_page = per_page
+        self.ttl_seconds = ttl_seconds
+        self.ids_by_email = {}
+        self.built_at = None
+
+    def refresh(self):
+        """Page through every auth user and rebuild the index"""
+        ids_by_email = {}
+        page = 1
+        while True:
+            users = self.client.auth.admin.list_users(page=page, per_page=self.per_page)
+            for user in users:
+                if user.email:
+                    ids_by_email[user.email.lower()] = user.id
+            if len(users) < self.per_page:
+                break
+            page += 1
+        self.ids_by_email = ids_by_email
+        self.built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self.built_at is None or time.monotonic() - self.built_at > self.ttl_seconds:
+            self.refresh()
+
+    def get(self, email):
+        """Return the user id for email, or None"""
+        self._ensure_fresh()
+        return self.ids_by_email.get(email.lower())
+
+    def lookup_many(self, emails):
+        """Return {email: user id or None} for all emails in one pass"""
+        self._ensure_fresh()
+        return {email: self.ids_by_email.get(email.lower()) for email in emails}
+
+_user_index = None
+
+def get_user_index():
+    """Return the shared UserIndex, creating it on first use"""
+    global _user_index
+    if _user_index is None:
+        _user_index = UserIndex()
+    return _user_index
+
 def get_user_id(email):
     """Get user ID by email"""
     try:
-        response = supabase.auth.admin.list_users()
-        for user in response:
-            if user.email == email:
-                return user.id
-        print(f"User {email} not found")
-        return None
+        user_id = get_user_index().get(email)
+        if user_id is None:
+            print(f"User {email} not found")
+        return user_id
     except Exception as e:
         print(f"Error getting user ID: {e}")
         return None
 
-def add_mock_journal_data():
+def get_user_ids(emails):
+    """Get user IDs for many emails with a single pass over auth users"""
+    try:
+        ids = get_user_index().lookup_many(emails)
+    except Exception as e:
+        print(f"Error getting user IDs: {e}")
+        return {email: None for email in emails}
+    for email, user_id in ids.items():
+        if user_id is None:
+            print(f"User {email} not found")
+    return ids
+
+def is_retryable(error):
+    """True if a failed insert may succeed when sent again"""
+    if isinstance(error, (httpx.TransportError, OSError)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or '')
+        # Non-JSON error bodies carry the HTTP status as the code
+        if code.isdigit():
+            return int(code) in RETRYABLE_STATUS
+        return (code in RETRYABLE_POSTGREST_CODES
+                or (len(code) == 5 and code.startswith(RETRYABLE_SQLSTATE_CLASSES)))
+    return False
+
+def insert_entries_batched(entries, table='daily_entries', chunk_size=DEFAULT_CHUNK_SIZE,
+                           max_retries=DEFAULT_MAX_RETRIES,
+                           backoff_seconds=DEFAULT_BACKOFF_SECONDS, client=None,
+                           upsert=False, checkpoint=None):
+    """Insert entries in chunks, retrying failed chunks with exponential backoff.
+
+    Only transient failures (connection errors, timeouts, 408/425/429/5xx)
+    are retried; a chunk that fails otherwise, or still fails after
+    max_retries, is recorded and skipped, so one bad chunk doesn't stop the
+    rest of the seed. With upsert=True rows are
+    merged on (user_id, date, time_of_day) instead of inserted. With a
+    SeedCheckpoint, rows it already covers are skipped, every committed chunk
+    is recorded, and the run stops at the first chunk that keeps failing so a
+    rerun resumes there. Returns a stats dict.
+    """
+    client = client or supabase
+    stats = {'rows': 0, 'chunks': 0, 'retries': 0, 'failed_rows': 0, 'skipped_rows': 0,
+             'errors': []}
+    started = time.perf_counter()
+    first_row = checkpoint.committed_rows if checkpoint else 0
+    stats['skipped_rows'] = min(first_row, len(entries))
+
+    for start in range(first_row, len(entries), chunk_size):
+        chunk = entries[start:start + chunk_size]
+        for attempt in range(max_retries + 1):
+            try:
+                if upsert:
+                    client.table(table).upsert(chunk, on_conflict=ON_CONFLICT).execute()
+                else:
+                    client.table(table).insert(chunk).execute()
+                stats['rows'] += len(chunk)
+                stats['chunks'] += 1
+                if checkpoint:
+                    checkpoint.mark_committed(start, len(chunk))
+                break
+            except Exception as e:
+                if attempt == max_retries or not is_retryable(e):
+                    stats['failed_rows'] += len(chunk)
+                    stats['errors'].append(f"rows {start}-{start + len(chunk) - 1}: {e}")
+                    print(f"❌ Chunk at row {start} failed after {attempt + 1} attempts: {e}")
+                    break
+                stats['retries'] += 1
+                time.sleep(backoff_seconds * (2 ** attempt))
+        if checkpoint and stats['failed_rows']:
+            print(f"⏸️ Stopping; rerun to resume from row {checkpoint.committed_rows}")
+            break
+
+    stats['elapsed'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['rows'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+    return stats
+
+def print_insert_report(stats):
+    """Print the outcome of a batched insert"""
+    print(f"\n📊 Inserted {stats['rows']} rows in {stats['chunks']} chunks "
+          f"({stats['elapsed']:.2f}s, {stats['rows_per_second']:.0f} rows/s)")
+    if stats['skipped_rows']:
+        print(f"   ⏭️ Skipped (already committed): {stats['skipped_rows']}")
+    if stats['retries']:
+        print(f"   🔁 Retries: {stats['retries']}")
+    if stats['failed_rows']:
+        print(f"   ❌ Failed rows: {stats['failed_rows']}")
+
+def add_mock_journal_data(chunk_size=DEFAULT_CHUNK_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                          upsert=False, checkpoint_path=None):
     """Add mock journal data for ענבל"""
     
     # Get user ID
     user_id = get_user_id('inbald@sapir.ac.il')
     if not user_id:
         print("Creating mock user...")
-        # For demo purposes, we'll use a mock user ID
-        user_id = 'mock-user-' + str(int(datetime.now().timestamp()))
+        # For demo purposes, we'll use a mock user ID. A resumable run needs
+        # the same ID every time so its checkpoint still matches.
+        if checkpoint_path:
+            user_id = 'mock-user-inbald'
+        else:
+            user_id = 'mock-user-' + str(int(datetime.now().timestamp()))
     
     print(f"Using user ID: {user_id}")
     
@@ -393,22 +558,42 @@ def add_mock_journal_data():
     
     # Add entries to database
     try:
-        for entry in entries:
-            result = supabase.table('daily_entries').insert(entry).execute()
-            print(f"Added entry for {entry['date']} {entry['time_of_day']}")
-        
-        print(f"\n✅ Successfully added {len(entries)} journal entries for ענבל!")
-        print("The entries include:")
-        print("- Various sleep quality levels (excellent, good, fair, poor)")
-        print("- Different moods (happy, content, frustrated, tired, etc.)")
-        print("- Multiple symptoms (hot flashes, night sweats, dryness, bloating, etc.)")
-        print("- Energy levels from low to high")
-        print("- Concentration difficulties and sleep issues")
-        print("- Hebrew insights for each entry")
-        
-    except Exception as e:
-        print(f"Error adding entries: {e}")
+        checkpoint = SeedCheckpoint(checkpoint_path, entries_fingerprint(entries)) if checkpoint_path else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    stats = insert_entries_batched(entries, chunk_size=chunk_size, max_retries=max_retries,
+                                   upsert=upsert or checkpoint is not None, checkpoint=checkpoint)
+    print_insert_report(stats)
+    if stats['failed_rows']:
+        print("Error adding entries:")
+        for error in stats['errors']:
+            print(f"   {error}")
+        return stats
+
+    print(f"\n✅ Successfully {'upserted' if upsert or checkpoint else 'added'} "
+          f"{len(entries)} journal entries for ענבל!")
+    print("The entries include:")
+    print("- Various sleep quality levels (excellent, good, fair, poor)")
+    print("- Different moods (happy, content, frustrated, tired, etc.)")
+    print("- Multiple symptoms (hot flashes, night sweats, dryness, bloating, etc.)")
+    print("- Energy levels from low to high")
+    print("- Concentration difficulties and sleep issues")
+    print("- Hebrew insights for each entry")
+    return stats
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add mock journal data for ענבל")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per insert request")
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help="retries per failed chunk")
+    parser.add_argument('--upsert', action='store_true',
+                        help="upsert on (user_id, date, time_of_day) so reruns don't duplicate rows")
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help="resume from / record progress in this file (implies --upsert)")
+    args = parser.parse_args()
+
     print("Adding mock journal data for ענבל (inbald@sapir.ac.il)...")
-    add_mock_journal_data()
+    add_mock_journal_data(chunk_size=args.chunk_size, max_retries=args.max_retries,
+                          upsert=args.upsert, checkpoint_path=args.checkpoint)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Async concurrent seeder for daily_entries.
+Streams generated journal rows to the Supabase REST endpoint over a shared
+pool of keep-alive connections, with a bounded number of requests in flight.
+
+Rows come from generate_journal_data.JournalGenerator. Batches are handed to a
+fixed set of worker tasks through a bounded queue, so when the server slows
+down the queue fills up and the producer waits instead of piling up requests.
+429/5xx answers are retried with exponential backoff (honouring Retry-After).
+With --checkpoint, rows are upserted on (user_id, date, time_of_day) and the
+committed prefix is recorded after each batch, so a rerun with the same
+arguments skips what already landed.
+
+daily_entries.user_id references auth.users, so rows are only generated for
+existing users: the --user-id values, or else the first --users accounts
+listed by the auth admin API.
+
+Usage:
+    python async_seed_journal.py --users 200 --days 90 --in-flight 16 --batch-size 200
+    # Against the local stand-in:
+    python mock_postgrest_server.py --users 200 --latency-ms 40 --load-latency-ms 5 &
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 \
+    SUPABASE_SERVICE_ROLE_KEY=local.stand.in python async_seed_journal.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from datetime import date
+from itertools import islice
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import httpx
+    from dotenv import load_dotenv
+except ImportError:
+    print("Please install required packages: pip install httpx python-dotenv")
+    sys.exit(1)
+
+from chat_load_test import LatencyHistogram
+from generate_journal_data import COLUMNS, JournalGenerator
+from seed_checkpoint import ON_CONFLICT, SeedCheckpoint, job_fingerprint
+
+DEFAULT_IN_FLIGHT = 16
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_SECONDS = 0.25
+REQUEST_TIMEOUT_SECONDS = 30.0
+USER_PAGE_SIZE = 1000
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+class SeedStats:
+    """Counters shared by the worker tasks"""
+
+    def __init__(self):
+        self.rows = 0
+        self.failed_rows = 0
+        self.requests = 0
+        self.retries = 0
+        self.outcomes = Counter()
+        self.latency = LatencyHistogram()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, outcome, latency):
+        self.requests += 1
+        self.outcomes[outcome] += 1
+        self.latency.record_seconds(latency)
+
+    def report(self):
+        """Print throughput, latency and error rates"""
+        elapsed = self.elapsed or time.perf_counter() - self.started
+        errors = sum(n for outcome, n in self.outcomes.items() if outcome != '2xx')
+
+        def percentile(percent):
+            value = self.latency.percentile(percent)
+            return value / 1000 if value is not None else 0.0
+
+        print(f"\n📊 Seeded {self.rows} rows in {elapsed:.2f}s ({self.rows / elapsed:,.0f} rows/s)")
+        print(f"   Requests: {self.requests} ({self.requests / elapsed:,.1f} req/s), retries: {self.retries}")
+        print(f"   Latency p50 {percentile(50):.1f} ms | p95 {percentile(95):.1f} ms | "
+              f"p99 {percentile(99):.1f} ms")
+        print(f"   Error rate: {errors / self.requests if self.requests else 0:.2%}")
+        for outcome, count in sorted(self.outcomes.items()):
+            print(f"      {outcome}: {count}")
+        if self.failed_rows:
+            print(f"   ❌ Failed rows: {self.failed_rows}")
+
+def _retry_delay(response, attempt, backoff_seconds):
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return backoff_seconds * (2 ** attempt)
+
+async def post_batch(client, endpoint, batch, stats, max_retries, backoff_seconds):
+    """POST one batch, retrying retryable failures; returns True if it landed"""
+    for attempt in range(max_retries + 1):
+        response = None
+        started = time.perf_counter()
+        try:
+            response = await client.post(endpoint, json=batch)
+            outcome = f"{response.status_code // 100}xx"
+        except httpx.TimeoutException:
+            outcome = 'timeout'
+        except httpx.TransportError:
+            outcome = 'connection'
+        stats.record(outcome, time.perf_counter() - started)
+
+        if outcome == '2xx':
+            stats.rows += len(batch)
+            return True
+        retryable = response is None or response.status_code in RETRYABLE_STATUS
+        if not retryable or attempt == max_retries:
+            detail = response.text[:200] if response is not None else outcome
+            print(f"❌ Batch of {len(batch)} rows failed: {detail}")
+            stats.failed_rows += len(batch)
+            return False
+        stats.retries += 1
+        await asyncio.sleep(_retry_delay(response, attempt, backoff_seconds))
+
+async def fetch_user_ids(url, key, limit, per_page=USER_PAGE_SIZE):
+    """Ids of up to `limit` existing auth users, paging through the admin API"""
+    headers = {'apikey': key, 'Authorization': f"Bearer {key}"}
+    user_ids = []
+    async with httpx.AsyncClient(base_url=url.rstrip('/'), headers=headers,
+                                 timeout=REQUEST_TIMEOUT_SECONDS) as client:
+        page = 1
+        while len(user_ids) < limit:
+            response = await client.get('/auth/v1/admin/users',
+                                        params={'page': page, 'per_page': per_page})
+            response.raise_for_status()
+            users = response.json().get('users') or []
+            user_ids.extend(user['id'] for user in users)
+            if len(users) < per_page:
+                break
+            page += 1
+    return user_ids[:limit]
+
+async def seed(rows, url, key, table='daily_entries', in_flight=DEFAULT_IN_FLIGHT,
+               batch_size=DEFAULT_BATCH_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+               backoff_seconds=DEFAULT_BACKOFF_SECONDS, upsert=False, checkpoint=None):
+    """Send rows (tuples in COLUMNS order) concurrently and return SeedStats.
+
+    With a SeedCheckpoint, rows it already covers are skipped, rows are
+    upserted, and each landed batch is recorded in the checkpoint.
+    """
+    stats = SeedStats()
+    queue = asyncio.Queue(maxsize=in_flight)
+    limits = httpx.Limits(max_connections=in_flight, max_keepalive_connections=in_flight)
+    upsert = upsert or checkpoint is not None
+    headers = {
+        'apikey': key,
+        'Authorization': f"Bearer {key}",
+        'Prefer': 'return=minimal,resolution=merge-duplicates' if upsert else 'return=minimal',
+    }
+    first_row = checkpoint.committed_rows if checkpoint else 0
+    if first_row:
+        print(f"⏭️ Resuming after {first_row} committed rows")
+
+    async with httpx.AsyncClient(base_url=url.rstrip('/'), headers=headers, limits=limits,
+                                 timeout=REQUEST_TIMEOUT_SECONDS) as client:
+        endpoint = f"/rest/v1/{table}"
+        if upsert:
+            endpoint += f"?on_conflict={ON_CONFLICT}"
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    start, batch = item
+                    landed = await post_batch(client, endpoint, batch, stats, max_retries,
+                                              backoff_seconds)
+                    if landed and checkpoint:
+                        checkpoint.mark_committed(start, len(batch))
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(in_flight)]
+        batch = []
+        start = first_row
+        for row in islice(rows, first_row, None):
+            batch.append(dict(zip(COLUMNS, row)))
+            if len(batch) == batch_size:
+                # Blocks while every worker is busy and the queue is full
+                await queue.put((start, batch))
+                start += len(batch)
+                batch = []
+        if batch:
+            await queue.put((start, batch))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Concurrently seed generated daily_entries rows")
+    parser.add_argument('--users', type=int, default=50,
+                        help="seed for this many existing auth users")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--user-id', action='append', default=[],
+                        help="existing user id to seed for (repeatable); overrides --users")
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--in-flight', type=int, default=DEFAULT_IN_FLIGHT,
+                        help="concurrent requests (and pooled connections)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument('--upsert', action='store_true',
+                        help="upsert on (user_id, date, time_of_day) so reruns don't duplicate rows")
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help="resume from / record progress in this file (implies --upsert)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        print("Error: Missing Supabase environment variables")
+        print("Please check your .env.local file")
+        sys.exit(1)
+
+    user_ids = args.user_id
+    if not user_ids:
+        try:
+            user_ids = asyncio.run(fetch_user_ids(url, key, args.users))
+        except httpx.HTTPError as e:
+            print(f"Error listing auth users: {e}")
+            sys.exit(1)
+        if not user_ids:
+            print("Error: No auth users found; create users first or pass --user-id")
+            sys.exit(1)
+        if len(user_ids) < args.users:
+            print(f"⚠️ Only {len(user_ids)} auth users exist; seeding for those")
+    generator = JournalGenerator(len(user_ids), args.days, args.start_date, seed=args.seed,
+                                 user_ids=user_ids)
+    print(f"🌱 Seeding {generator.users * args.days * 2} entries "
+          f"({args.in_flight} in flight, {args.batch_size} rows/request)...")
+    checkpoint = None
+    if args.checkpoint:
+        job_id = job_fingerprint('generate_journal_data', generator.users, args.days, args.start_date,
+                                 args.seed, *user_ids)
+        try:
+            checkpoint = SeedCheckpoint(args.checkpoint, job_id)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    stats = asyncio.run(seed(generator.rows(), url, key, in_flight=args.in_flight,
+                             batch_size=args.batch_size, max_retries=args.max_retries,
+                             upsert=args.upsert, checkpoint=checkpoint))
+    stats.report()
+    if stats.failed_rows:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Keep-alive HTTP client for the chat API tooling.
+urllib.request.urlopen opens a new TCP connection for every call, so a
+loop of requests measures handshakes as much as the endpoint, and a load
+test burns through ephemeral ports. ChatClient instead keeps persistent
+http.client connections in a ConnectionPool:
+
+- at most `max_per_host` connections per (scheme, host, port), checked out
+  or idle; callers wait (up to `acquire_timeout`) when a host is at its limit
+- idle connections are reused most-recent first, and dropped once they have
+  been idle longer than `idle_timeout` (Node's HTTP server closes keep-alive
+  sockets after 5s) or the server has already closed them
+- idempotent requests (GET/HEAD/PUT/DELETE/OPTIONS, or any request marked
+  idempotent) are retried with exponential backoff on connection errors and
+  408/425/429/5xx answers; POST /api/chat writes messages and spends
+  credits, so it is not retried unless the caller says so
+
+PoolStats counts connections opened and reused, stale ones dropped, waits
+for a free slot and retries.
+
+Usage:
+    client = ChatClient(ConnectionPool(max_per_host=8))
+    status, body = client.post_json('http://localhost:3000/api/chat', payload)
+    print_pool_stats(client.pool.stats)
+"""
+
+import http.client
+import json
+import os
+import select
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_stream_client import REQUEST_TIMEOUT_SECONDS, request_path, stream_chat
+
+DEFAULT_MAX_PER_HOST = 10
+DEFAULT_MAX_IDLE = 100
+DEFAULT_IDLE_TIMEOUT_SECONDS = 4.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.1
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'})
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+class PoolTimeout(Exception):
+    """No connection to the host became free within the acquire timeout"""
+
+class PoolStats:
+    """Connection and retry counters, safe to update from several threads"""
+
+    FIELDS = ('requests', 'connections_opened', 'connections_reused', 'stale_dropped',
+              'idle_expired', 'waits', 'retries', 'discarded')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, field, count=1):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    def reuse_rate(self):
+        """Share of requests that went over an already-open connection"""
+        checkouts = self.connections_opened + self.connections_reused
+        return self.connections_reused / checkouts if checkouts else 0.0
+
+    def as_dict(self):
+        stats = {field: getattr(self, field) for field in self.FIELDS}
+        stats['reuse_rate'] = self.reuse_rate()
+        return stats
+
+def _host_key(url):
+    parts = urlsplit(url)
+    scheme = parts.scheme or 'http'
+    return scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80)
+
+def _is_dropped(connection):
+    """True if the server has closed an idle connection (or sent something unasked)"""
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+class ConnectionPool:
+    """Bounded pool of persistent http.client connections, keyed by host"""
+
+    def __init__(self, max_per_host=DEFAULT_MAX_PER_HOST, max_idle=DEFAULT_MAX_IDLE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT_SECONDS, timeout=REQUEST_TIMEOUT_SECONDS,
+                 acquire_timeout=None):
+        self.max_per_host = max_per_host
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.stats = PoolStats()
+        self._condition = threading.Condition()
+        self._idle = defaultdict(list)      # host key -> [(connection, last used)], newest last
+        self._idle_count = 0
+        self._checked_out = defaultdict(int)
+        self._closed = False
+
+    def _new_connection(self, key):
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout)
+
+    def _acquire(self, key):
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        waited = False
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ConnectionPool is closed")
+                idle = self._idle[key]
+                while idle:
+                    connection, last_used = idle.pop()
+                    self._idle_count -= 1
+                    if time.monotonic() - last_used > self.idle_timeout:
+                        self.stats.add('idle_expired')
+                    elif _is_dropped(connection):
+                        self.stats.add('stale_dropped')
+                    else:
+                        self._checked_out[key] += 1
+                        self.stats.add('connections_reused')
+                        return connection
+                    connection.close()
+                if self._checked_out[key] < self.max_per_host:
+                    self._checked_out[key] += 1
+                    self.stats.add('connections_opened')
+                    return self._new_connection(key)
+                if not waited:
+                    self.stats.add('waits')
+                    waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No free connection to {key[1]}:{key[2]} "
+                                      f"after {self.acquire_timeout:g}s")
+                self._condition.wait(remaining)
+
+    def _release(self, key, connection, reusable):
+        with self._condition:
+            self._checked_out[key] -= 1
+            # http.client drops the socket itself when the response said Connection: close
+            if reusable and connection.sock is not None and not self._closed \
+                    and self._idle_count < self.max_idle:
+                self._idle[key].append((connection, time.monotonic()))
+                self._idle_count += 1
+            else:
+                connection.close()
+                if not reusable:
+                    self.stats.add('discarded')
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, url):
+        """Check out a connection to the URL's host; the response must be read in full before exit.
+
+        The connection goes back to the pool on a normal exit and is closed if
+        the block raises.
+        """
+        key = _host_key(url)
+        connection = self._acquire(key)
+        self.stats.add('requests')
+        try:
+            yield connection
+        except BaseException:
+            self._release(key, connection, reusable=False)
+            raise
+        self._release(key, connection, reusable=True)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            for idle in self._idle.values():
+                for connection, _ in idle:
+                    connection.close()
+            self._idle.clear()
+            self._idle_count = 0
+            self._condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ChatClient:
+    """JSON and streaming requests over a ConnectionPool, with retries for idempotent requests"""
+
+    def __init__(self, pool=None, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF_SECONDS):
+        self.pool = pool or ConnectionPool()
+        self.retries = retries
+        self.backoff = backoff
+
+    def _retry_delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt)
+
+    def request(self, method, url, body=None, headers=None, idempotent=None):
+        """Send a request; returns (status, headers dict, body bytes).
+
+        `idempotent` defaults to whether the method is; only idempotent
+        requests are retried.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        path = request_path(url)
+        attempt = 0
+        while True:
+            try:
+                with self.pool.connection(url) as connection:
+                    connection.request(method, path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                    data = response.read()
+            except (OSError, http.client.HTTPException):
+                if not idempotent or attempt >= self.retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+            else:
+                response_headers = {name.lower(): value for name, value in response.getheaders()}
+                if not (idempotent and response.status in RETRYABLE_STATUS and attempt < self.retries):
+                    return response.status, response_headers, data
+                time.sleep(self._retry_delay(attempt, response_headers.get('retry-after')))
+            attempt += 1
+            self.pool.stats.add('retries')
+
+    def post_json(self, url, payload, idempotent=False):
+        """POST a JSON payload; returns (status, body bytes)"""
+        body = json.dumps(payload).encode('utf-8')
+        status, _, data = self.request('POST', url, body=body,
+                                       headers={'Content-Type': 'application/json'},
+                                       idempotent=idempotent)
+        return status, data
+
+    def stream_chat(self, url, payload):
+        """chat_stream_client.stream_chat() over a pooled connection"""
+        with self.pool.connection(url) as connection:
+            return stream_chat(url, payload, connection=connection)
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def print_pool_stats(stats):
+    print(f"🔗 Connections: {stats.connections_opened} opened, {stats.connections_reused} reused "
+          f"({stats.reuse_rate():.1%} reuse), {stats.stale_dropped} stale dropped, "
+          f"{stats.idle_expired} idle expired")
+    if stats.waits or stats.retries or stats.discarded:
+        print(f"   {stats.waits} waits for a free connection, {stats.retries} retries, "
+              f"{stats.discarded} connections discarded after errors")
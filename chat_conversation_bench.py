@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Multi-turn conversation replay benchmark for the /api/chat endpoint.
+Replays scripted Hebrew conversations turn by turn, carrying the
+conversationId returned by each answer into the next request (the route
+loads the conversation's history on every turn), and runs many
+conversations in parallel. Latency and response size are aggregated by
+turn index, so growth with conversation length shows up directly.
+
+For each turn index the report shows p50/p95 latency (HDR histograms from
+chat_load_test), mean response size, rawTokens when the server reports it,
+and a bar chart of p50 latency against turn index. The growth check fits a
+line to p50 latency over the first and second half of the turns; a second
+half slope well above the first half's means latency grows faster than
+linearly with history.
+
+Usage:
+    python chat_conversation_bench.py --conversations 20 --parallel 5
+    python chat_conversation_bench.py --script conversations.json --turns 12 --stream
+    python chat_conversation_bench.py --mock --mock-history-latency-ms 15 --turns 10
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_client import ChatClient, ConnectionPool, print_pool_stats
+from chat_load_test import LatencyHistogram, classify_error
+from chat_stream_client import DEFAULT_URL, DEFAULT_USER_ID
+from mock_chat_server import start_server
+
+DEFAULT_CONVERSATIONS = 10
+DEFAULT_PARALLEL = 4
+SUPERLINEAR_RATIO = 1.5
+CHART_WIDTH = 40
+# Fewer turns than this are too noisy to compare the two halves
+MIN_GROWTH_TURNS = 6
+# Scripted conversations; --script replaces them
+CONVERSATION_SCRIPTS = [
+    [
+        "שלום עליזה",
+        "אני מתעוררת כל לילה עם גלי חום",
+        "זה קורה בעיקר בין שתיים לארבע בלילה",
+        "ניסיתי לישון עם מאוורר אבל זה לא ממש עוזר",
+        "האם יש קשר למה שאני אוכלת בערב?",
+        "אני שותה כוס יין לפעמים עם ארוחת הערב",
+        "ומה לגבי קפה אחר הצהריים?",
+        "תודה, אנסה לשים לב לזה השבוע",
+    ],
+    [
+        "היי, יש לי שאלה על ערפל מוחי",
+        "אני שוכחת מילים באמצע משפט בעבודה",
+        "זה מלחיץ אותי מאוד מול הצוות",
+        "האם זה עובר עם הזמן?",
+        "מה אפשר לעשות בינתיים?",
+        "אני ישנה בערך חמש שעות בלילה",
+        "אולי זה קשור לשינה?",
+        "אוקיי, אז מאיפה כדאי להתחיל?",
+    ],
+    [
+        "בוקר טוב",
+        "הרגשתי מאוד עצבנית אתמול בלי סיבה",
+        "בן הזוג שלי לא מבין מה עובר עליי",
+        "איך אפשר להסביר לו?",
+        "לפעמים אני מרגישה שאני כבר לא אני",
+        "יש לך רעיון למשהו קטן שאפשר לעשות היום?",
+        "נשמע טוב, ואם זה לא יעזור?",
+        "תודה עליזה, זה עזר לי",
+    ],
+]
+
+def load_scripts(path):
+    """Conversations from a JSON file (a list of lists of messages) or JSONL (one list per line)"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            scripts = [json.loads(line) for line in f if line.strip()]
+        else:
+            scripts = json.load(f)
+    if not scripts or not all(isinstance(script, list) and script for script in scripts):
+        raise ValueError(f"{path} must hold a non-empty list of non-empty message lists")
+    return scripts
+
+class TurnStats:
+    """Aggregates for one turn index across all conversations"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.first_token = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.response_bytes = 0
+        self.raw_tokens = 0
+        self.raw_token_turns = 0
+
+    def mean_bytes(self):
+        ok = self.requests - self.errors
+        return self.response_bytes / ok if ok else 0.0
+
+    def mean_raw_tokens(self):
+        return self.raw_tokens / self.raw_token_turns if self.raw_token_turns else None
+
+class ConversationBench:
+    """Runs scripted conversations and collects per-turn statistics"""
+
+    def __init__(self, client, url, user_id=DEFAULT_USER_ID, stream=False):
+        self.client = client
+        self.url = url
+        self.user_id = user_id
+        self.stream = stream
+        self.turns = []
+        self.errors = {}
+        self.completed = 0
+        self.lock = threading.Lock()
+
+    def _send(self, payload):
+        """(status, response bytes, metadata dict, latency s, first token s or None, error class)"""
+        started = time.perf_counter()
+        if self.stream:
+            timing = self.client.stream_chat(self.url, payload)
+            metadata = timing.metadata
+            error = classify_error(timing.status) or ("api_error" if timing.error else None)
+            return timing.status, timing.body_bytes, metadata, timing.total, timing.first_token, error
+        status, body = self.client.post_json(self.url, payload)
+        latency = time.perf_counter() - started
+        error = classify_error(status, body=body)
+        try:
+            metadata = json.loads(body)
+        except ValueError:
+            metadata = {}
+        return status, len(body), metadata if isinstance(metadata, dict) else {}, latency, None, error
+
+    def _record(self, turn, size, metadata, latency, first_token, error):
+        with self.lock:
+            while len(self.turns) <= turn:
+                self.turns.append(TurnStats())
+            stats = self.turns[turn]
+            stats.requests += 1
+            stats.latency.record_seconds(latency)
+            if first_token is not None:
+                stats.first_token.record_seconds(first_token)
+            if error:
+                stats.errors += 1
+                self.errors[error] = self.errors.get(error, 0) + 1
+                return
+            stats.response_bytes += size
+            if isinstance(metadata.get("rawTokens"), int):
+                stats.raw_tokens += metadata["rawTokens"]
+                stats.raw_token_turns += 1
+
+    def run_conversation(self, messages):
+        """Send `messages` in order on one conversation; stops at the first failed turn"""
+        conversation_id = None
+        for turn, message in enumerate(messages):
+            payload = {"message": message, "userId": self.user_id, "conversationId": conversation_id}
+            started = time.perf_counter()
+            try:
+                _, size, metadata, latency, first_token, error = self._send(payload)
+            except Exception as e:
+                self._record(turn, 0, {}, time.perf_counter() - started, None, classify_error(exception=e))
+                return
+            if not error and not metadata.get("conversationId"):
+                error = "no_conversation_id"
+            self._record(turn, size, metadata, latency, first_token, error)
+            if error:
+                return
+            conversation_id = metadata["conversationId"]
+        with self.lock:
+            self.completed += 1
+
+    def run(self, scripts, conversations, parallel, turns=None):
+        """Replay `conversations` conversations (cycling through `scripts`), `parallel` at a time"""
+        jobs = []
+        for i in range(conversations):
+            script = scripts[i % len(scripts)]
+            count = turns or len(script)
+            jobs.append([script[turn % len(script)] for turn in range(count)])
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            list(executor.map(self.run_conversation, jobs))
+        return self
+
+def _slope(points):
+    """Least-squares slope of (x, y) points, or None for fewer than two"""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+def growth(turns):
+    """(overall, first half, second half) slopes of p50 latency in ms per turn"""
+    points = [(i + 1, stats.latency.percentile(50) / 1000)
+              for i, stats in enumerate(turns) if stats.latency.total]
+    if len(points) < MIN_GROWTH_TURNS:
+        return _slope(points), None, None
+    half = (len(points) + 1) // 2
+    # The halves share the middle turn so each fit has at least two points
+    return _slope(points), _slope(points[:half]), _slope(points[half - 1:])
+
+def print_report(bench, elapsed):
+    turns = bench.turns
+    total = sum(stats.requests for stats in turns)
+    print(f"📊 {bench.completed} conversations completed, {total} turns in {elapsed:.2f}s")
+    if not turns:
+        return
+    widest = max(stats.latency.percentile(50) or 0 for stats in turns) or 1
+    print("💬 Latency and size by turn:")
+    for i, stats in enumerate(turns):
+        p50 = stats.latency.percentile(50)
+        p95 = stats.latency.percentile(95)
+        bar = "█" * max(1, round(CHART_WIDTH * p50 / widest))
+        line = (f"   turn {i + 1:>2} {bar:<{CHART_WIDTH}} p50 {p50 / 1000:7.1f} ms  p95 {p95 / 1000:7.1f} ms"
+                f"  {stats.mean_bytes():7.0f} B")
+        if stats.first_token.total:
+            line += f"  first token {stats.first_token.percentile(50) / 1000:.1f} ms"
+        if stats.mean_raw_tokens() is not None:
+            line += f"  {stats.mean_raw_tokens():.0f} tokens"
+        if stats.errors:
+            line += f"  ❌ {stats.errors}/{stats.requests}"
+        print(line)
+
+    overall, early, late = growth(turns)
+    if overall is not None:
+        print(f"📈 p50 latency grows {overall:+.1f} ms per turn")
+    if early is not None and late is not None:
+        print(f"   first half {early:+.1f} ms/turn, second half {late:+.1f} ms/turn")
+        if late > 0 and late > max(early, 0) * SUPERLINEAR_RATIO:
+            print("⚠️ Latency grows faster than linearly with conversation length - "
+                  "check history loading and prompt building")
+        else:
+            print("✅ No superlinear growth detected")
+    if bench.errors:
+        print("❌ Errors: " + ", ".join(f"{error}: {count}" for error, count in sorted(bench.errors.items())))
+
+def write_csv(bench, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["turn", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "first_token_p50_ms",
+                         "mean_response_bytes", "mean_raw_tokens"])
+        for i, stats in enumerate(bench.turns):
+            first_token = stats.first_token.percentile(50)
+            writer.writerow([i + 1, stats.requests, stats.errors,
+                             stats.latency.percentile(50) / 1000, stats.latency.percentile(95) / 1000,
+                             stats.latency.percentile(99) / 1000,
+                             first_token / 1000 if first_token is not None else "",
+                             round(stats.mean_bytes(), 1), stats.mean_raw_tokens() or ""])
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Replay multi-turn conversations against the chat API")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--user-id", default=DEFAULT_USER_ID)
+    parser.add_argument("--script", help="JSON/JSONL file of conversations (lists of messages)")
+    parser.add_argument("--conversations", type=positive_int, default=DEFAULT_CONVERSATIONS)
+    parser.add_argument("--parallel", type=positive_int, default=DEFAULT_PARALLEL, help="conversations in flight")
+    parser.add_argument("--turns", type=positive_int, help="turns per conversation (scripts repeat to fill)")
+    parser.add_argument("--stream", action="store_true", help="read replies incrementally and time first tokens")
+    parser.add_argument("--csv", help="write the per-turn table to this CSV file")
+    parser.add_argument("--mock", action="store_true", help="run against an in-process mock_chat_server")
+    parser.add_argument("--mock-latency", default="lognormal:40:0.3")
+    parser.add_argument("--mock-history-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    try:
+        scripts = load_scripts(args.script) if args.script else CONVERSATION_SCRIPTS
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    server = None
+    url = args.url
+    if args.mock:
+        server = start_server(latency=args.mock_latency, history_latency_ms=args.mock_history_latency_ms,
+                              reply="sse" if args.stream else "json")
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+
+    print(f"🎭 Replaying {args.conversations} conversations ({args.parallel} in parallel) against {url}")
+    started = time.perf_counter()
+    with ChatClient(ConnectionPool(max_per_host=args.parallel)) as client:
+        bench = ConversationBench(client, url, args.user_id, args.stream)
+        bench.run(scripts, args.conversations, args.parallel, args.turns)
+        elapsed = time.perf_counter() - started
+        print_report(bench, elapsed)
+        print_pool_stats(client.pool.stats)
+    if args.csv:
+        write_csv(bench, args.csv)
+        print(f"💾 Wrote {args.csv}")
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for the /api/chat endpoint.
+Runs a number of virtual users that post chat messages in a loop, optionally
+paced to a target request rate across all of them, until a duration or a
+request count is reached, and reports latency percentiles, error rates by
+class and requests per second.
+
+Latencies go into HDR-style histograms: log-linear buckets with a fixed
+relative precision (about 0.1%), so a run of any length keeps a few thousand
+counters instead of every sample. Each virtual user records into its own
+histogram and they are merged at the end, so recording takes no lock.
+
+With a target rate, requests are scheduled at fixed intervals and latency is
+also measured from the scheduled send time, so a server stall that delays
+later requests shows up in the numbers instead of being hidden (coordinated
+omission).
+
+Requests go over a keep-alive ConnectionPool (chat_client.py) with one
+connection per virtual user, so the numbers reflect the server rather than
+TCP handshakes; --new-connections opens a fresh connection per request to
+compare.
+
+Usage:
+    python chat_load_test.py --users 20 --duration 30
+    python chat_load_test.py --users 50 --rate 25 --requests 1000 --url http://localhost:3000/api/chat
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_client import ChatClient, ConnectionPool, print_pool_stats
+from chat_stream_client import DEFAULT_MESSAGE, DEFAULT_URL, DEFAULT_USER_ID, REQUEST_TIMEOUT_SECONDS
+
+DEFAULT_USERS = 10
+DEFAULT_DURATION_SECONDS = 10.0
+PERCENTILES = (50, 90, 95, 99, 99.9)
+# 2048 sub-buckets per power of two: 3 significant decimal digits
+SUB_BUCKET_BITS = 11
+
+class LatencyHistogram:
+    """HDR-style histogram of non-negative integer values (microseconds)"""
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        self.half = self.sub_buckets >> 1
+        self.counts = Counter()
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return shift * self.half + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        """Largest value that lands in bucket `index`"""
+        if index < self.sub_buckets:
+            return index
+        shift = index // self.half - 1
+        mantissa = index - shift * self.half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1_000_000)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum += other.sum
+        if other.total:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """Value at or below which `percent` of the recorded values fall"""
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+def classify_error(status=None, exception=None, body=None):
+    """Error class for a request outcome, or None if it succeeded"""
+    if exception is not None:
+        reason = getattr(exception, 'reason', exception)
+        if isinstance(reason, (socket.timeout, TimeoutError)):
+            return 'timeout'
+        if isinstance(reason, ConnectionRefusedError):
+            return 'connection_refused'
+        if isinstance(reason, (ConnectionError, OSError)):
+            return 'connection_error'
+        return type(exception).__name__
+    if status is not None and status >= 400:
+        return f"http_{status}"
+    if body is not None:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 'invalid_json'
+        if isinstance(payload, dict) and payload.get('error'):
+            return 'api_error'
+    return None
+
+def send_chat_request(url, payload, timeout=REQUEST_TIMEOUT_SECONDS):
+    """POST one chat message on a new connection; returns (status, body bytes)"""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+class LoadTestResult:
+    """Merged outcome of a load test"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.response_time = LatencyHistogram()
+        self.requests = 0
+        self.errors = Counter()
+        self.statuses = Counter()
+        self.elapsed = 0.0
+        self.paced = False
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.response_time.merge(other.response_time)
+        self.requests += other.requests
+        self.errors.update(other.errors)
+        self.statuses.update(other.statuses)
+        return self
+
+    def requests_per_second(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def error_rate(self):
+        return sum(self.errors.values()) / self.requests if self.requests else 0.0
+
+class _Schedule:
+    """Hands out request tickets until the request count or deadline is reached"""
+
+    def __init__(self, started, rate, duration, requests):
+        self.started = started
+        self.interval = 1 / rate if rate else 0.0
+        self.deadline = started + duration if duration else None
+        self.requests = requests
+        self.issued = 0
+        self.lock = threading.Lock()
+
+    def next(self):
+        """Intended send time of the next request, or None when the run is over"""
+        with self.lock:
+            if self.requests is not None and self.issued >= self.requests:
+                return None
+            when = self.started + self.issued * self.interval if self.interval else time.perf_counter()
+            if self.deadline is not None and when >= self.deadline:
+                return None
+            self.issued += 1
+            return when
+
+def _virtual_user(schedule, send, result):
+    while True:
+        intended = schedule.next()
+        if intended is None:
+            return
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        status = body = error = None
+        try:
+            status, body = send()
+        except Exception as e:
+            error = classify_error(exception=e)
+        else:
+            error = classify_error(status, body=body)
+        finished = time.perf_counter()
+        result.requests += 1
+        result.latency.record_seconds(finished - sent)
+        result.response_time.record_seconds(finished - min(intended, sent))
+        if status is not None:
+            result.statuses[status] += 1
+        if error:
+            result.errors[error] += 1
+
+def run_load_test(send, users=DEFAULT_USERS, rate=None, duration=DEFAULT_DURATION_SECONDS, requests=None):
+    """Call `send()` from `users` threads and return a LoadTestResult.
+
+    `send` returns (status, body) and may raise; `rate` is the target number
+    of requests per second across all users (None = as fast as possible).
+    The run stops after `duration` seconds or `requests` requests, whichever
+    comes first (either may be None, not both).
+    """
+    if duration is None and requests is None:
+        raise ValueError("Give a duration or a request count")
+    started = time.perf_counter()
+    schedule = _Schedule(started, rate, duration, requests)
+    results = [LoadTestResult() for _ in range(users)]
+    threads = [threading.Thread(target=_virtual_user, args=(schedule, send, result), daemon=True)
+               for result in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    merged = LoadTestResult()
+    for result in results:
+        merged.merge(result)
+    merged.elapsed = time.perf_counter() - started
+    merged.paced = bool(rate)
+    return merged
+
+def _format_ms(microseconds):
+    return f"{microseconds / 1000:.1f} ms" if microseconds is not None else "-"
+
+def print_report(result):
+    print(f"📊 {result.requests} requests in {result.elapsed:.2f}s "
+          f"({result.requests_per_second():.1f} req/s)")
+    histograms = [("Latency", result.latency)]
+    if result.paced:
+        histograms.append(("Response time (from scheduled send)", result.response_time))
+    for title, histogram in histograms:
+        print(f"⏱️ {title}:")
+        print(f"   min {_format_ms(histogram.min)}, mean {_format_ms(histogram.mean())}, "
+              f"max {_format_ms(histogram.max)}")
+        print("   " + ", ".join(f"p{percent:g} {_format_ms(histogram.percentile(percent))}"
+                                 for percent in PERCENTILES))
+    if result.statuses:
+        print("📡 Status codes: " + ", ".join(f"{status}: {count}"
+                                              for status, count in sorted(result.statuses.items())))
+    if result.errors:
+        print(f"❌ Errors ({result.error_rate():.1%}):")
+        for error, count in result.errors.most_common():
+            print(f"   {error}: {count} ({count / result.requests:.1%})")
+    else:
+        print("✅ No errors")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Load-test the chat API endpoint")
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--message', default=DEFAULT_MESSAGE)
+    parser.add_argument('--user-id', default=DEFAULT_USER_ID)
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help="concurrent virtual users")
+    parser.add_argument('--rate', type=float, help="target requests per second across all users")
+    parser.add_argument('--duration', type=float, help=f"seconds to run (default {DEFAULT_DURATION_SECONDS:g} "
+                                                       "unless --requests is given)")
+    parser.add_argument('--requests', type=int, help="total requests to send")
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT_SECONDS)
+    parser.add_argument('--new-connections', action='store_true',
+                        help="open a new connection per request instead of keeping them alive")
+    args = parser.parse_args()
+
+    duration = args.duration
+    if duration is None and args.requests is None:
+        duration = DEFAULT_DURATION_SECONDS
+    payload = {'message': args.message, 'userId': args.user_id, 'conversationId': None}
+    pacing = f"{args.rate:g} req/s" if args.rate else "unpaced"
+    limit = " and ".join(part for part in (f"{duration:g}s" if duration else None,
+                                           f"{args.requests} requests" if args.requests else None) if part)
+    print(f"🚀 Load testing {args.url}: {args.users} users, {pacing}, up to {limit}")
+    if args.new_connections:
+        result = run_load_test(lambda: send_chat_request(args.url, payload, args.timeout),
+                               users=args.users, rate=args.rate, duration=duration, requests=args.requests)
+        print_report(result)
+        return
+    with ChatClient(ConnectionPool(max_per_host=args.users, timeout=args.timeout)) as client:
+        result = run_load_test(lambda: client.post_json(args.url, payload),
+                               users=args.users, rate=args.rate, duration=duration, requests=args.requests)
+        print_report(result)
+        print_pool_stats(client.pool.stats)
+
+if __name__ == "__main__":
+    main()
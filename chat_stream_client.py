@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Streaming client for the /api/chat endpoint.
+Reads the response incrementally instead of buffering the whole body, and
+times each stage: TCP connect, time to first byte (response headers), time
+to first token, the gaps between tokens and the total duration.
+
+Handles the three shapes the route can answer with:
+- text/event-stream (SSE): every `data:` event is a token; JSON data is
+  unpacked from {"token"}, {"delta"}, {"content"}, {"response"} or the
+  OpenAI {"choices": [{"delta": {"content"}}]} shape, `[DONE]` ends the stream,
+  and other JSON keys (conversationId, creditsRemaining, ...) are kept as
+  metadata
+- any other chunked body: every chunk read off the socket is a token
+- application/json (today's non-streaming route): one token, the `response`
+  field, arriving with the last byte
+
+Hebrew text is decoded incrementally, so a character split across two chunks
+is not mangled.
+
+Usage:
+    python chat_stream_client.py
+    python chat_stream_client.py --url http://localhost:3000/api/chat --message "מה שלומך?"
+"""
+
+import argparse
+import codecs
+import http.client
+import json
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_URL = "http://localhost:3000/api/chat"
+DEFAULT_MESSAGE = "שלום עליזה"
+DEFAULT_USER_ID = "test-user-123"
+REQUEST_TIMEOUT_SECONDS = 30.0
+READ_SIZE = 16 * 1024
+TOKEN_KEYS = ('token', 'delta', 'content', 'text', 'response')
+
+class StreamTiming:
+    """Timings (seconds from the start of the request) and content of one streamed reply"""
+
+    def __init__(self):
+        self.status = None
+        self.content_type = None
+        self.mode = None
+        self.connect = None
+        self.first_byte = None
+        self.first_token = None
+        self.total = None
+        self.token_times = []
+        self.tokens = []
+        self.body_bytes = 0
+        self.metadata = {}
+        self.error = None
+
+    @property
+    def message(self):
+        """The assembled reply text"""
+        return ''.join(self.tokens)
+
+    def gaps(self):
+        """Seconds between consecutive tokens"""
+        return [later - earlier for earlier, later in zip(self.token_times, self.token_times[1:])]
+
+    def as_dict(self):
+        gaps = self.gaps()
+        return {
+            'status': self.status,
+            'mode': self.mode,
+            'connect_ms': _ms(self.connect),
+            'first_byte_ms': _ms(self.first_byte),
+            'first_token_ms': _ms(self.first_token),
+            'total_ms': _ms(self.total),
+            'tokens': len(self.tokens),
+            'body_bytes': self.body_bytes,
+            'mean_gap_ms': _ms(sum(gaps) / len(gaps)) if gaps else None,
+            'max_gap_ms': _ms(max(gaps)) if gaps else None,
+            'message': self.message,
+            'metadata': self.metadata,
+            'error': self.error,
+        }
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+def token_from_event(data):
+    """(token text or None, metadata dict) from one SSE data payload"""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data, {}
+    if not isinstance(payload, dict):
+        return (payload if isinstance(payload, str) else None), {}
+    metadata = dict(payload)
+    choices = metadata.pop('choices', None)
+    if choices and isinstance(choices[0], dict):
+        delta = choices[0].get('delta') or {}
+        return delta.get('content'), metadata
+    for key in TOKEN_KEYS:
+        if isinstance(metadata.get(key), str):
+            return metadata.pop(key), metadata
+    return None, metadata
+
+def request_path(url):
+    """Path and query of a URL, as sent in the request line"""
+    parts = urlsplit(url)
+    return (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+def open_connection(url, timeout=REQUEST_TIMEOUT_SECONDS):
+    """http.client connection for an http(s) URL; the socket is not opened yet"""
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return connection_class(parts.hostname, parts.port, timeout=timeout)
+
+class _Recorder:
+    """Collects tokens into a StreamTiming as they arrive"""
+
+    def __init__(self, timing, started):
+        self.timing = timing
+        self.started = started
+
+    def token(self, text):
+        if not text:
+            return
+        now = time.perf_counter() - self.started
+        if self.timing.first_token is None:
+            self.timing.first_token = now
+        self.timing.token_times.append(now)
+        self.timing.tokens.append(text)
+
+def _read_sse(response, recorder):
+    timing = recorder.timing
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    data_lines = []
+    event = None
+    while True:
+        chunk = response.read1(READ_SIZE)
+        timing.body_bytes += len(chunk)
+        pending += decoder.decode(chunk, final=not chunk)
+        *lines, pending = pending.split('\n')
+        if not chunk and pending:
+            lines.append(pending)
+            pending = ''
+        for line in lines:
+            line = line.rstrip('\r')
+            if line:
+                field, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if field == 'data':
+                    data_lines.append(value)
+                elif field == 'event':
+                    event = value
+                continue
+            # Blank line: dispatch the event
+            if data_lines:
+                data = '\n'.join(data_lines)
+                data_lines = []
+                if data.strip() == '[DONE]':
+                    return
+                text, metadata = token_from_event(data)
+                if event == 'error':
+                    timing.error = metadata.get('error') or text or data
+                else:
+                    recorder.token(text)
+                    timing.metadata.update(metadata)
+            event = None
+        if not chunk:
+            if data_lines:
+                text, metadata = token_from_event('\n'.join(data_lines))
+                recorder.token(text)
+                timing.metadata.update(metadata)
+            return
+
+def _read_chunks(response, recorder):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        chunk = response.read1(READ_SIZE)
+        recorder.timing.body_bytes += len(chunk)
+        recorder.token(decoder.decode(chunk, final=not chunk))
+        if not chunk:
+            return
+
+def _read_json(response, recorder):
+    timing = recorder.timing
+    body = bytearray()
+    while True:
+        chunk = response.read1(READ_SIZE)
+        if not chunk:
+            break
+        body += chunk
+    timing.body_bytes = len(body)
+    try:
+        payload = json.loads(body.decode('utf-8'))
+    except ValueError as e:
+        timing.error = f"Response is not JSON: {e}"
+        return
+    if not isinstance(payload, dict):
+        timing.error = "Response is not a JSON object"
+        return
+    metadata = dict(payload)
+    recorder.token(metadata.pop('response', None))
+    if metadata.get('error'):
+        timing.error = metadata['error']
+    timing.metadata = metadata
+
+def stream_chat(url, payload, timeout=REQUEST_TIMEOUT_SECONDS, connection=None):
+    """POST `payload` and read the reply incrementally; returns a StreamTiming.
+
+    Pass an open http.client connection to reuse it (connect time is then 0).
+    """
+    timing = StreamTiming()
+    owned = connection is None
+    if owned:
+        connection = open_connection(url, timeout)
+    path = request_path(url)
+    body = json.dumps(payload).encode('utf-8')
+    started = time.perf_counter()
+    try:
+        if connection.sock is None:
+            connection.connect()
+        timing.connect = time.perf_counter() - started
+        connection.request('POST', path, body=body, headers={
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream, application/json',
+        })
+        response = connection.getresponse()
+        timing.first_byte = time.perf_counter() - started
+        timing.status = response.status
+        timing.content_type = response.getheader('Content-Type') or ''
+        recorder = _Recorder(timing, started)
+        if timing.content_type.startswith('text/event-stream'):
+            timing.mode = 'sse'
+            _read_sse(response, recorder)
+        elif timing.content_type.startswith('application/json'):
+            timing.mode = 'json'
+            _read_json(response, recorder)
+        else:
+            timing.mode = 'chunked' if response.chunked else 'raw'
+            _read_chunks(response, recorder)
+        # Drain anything after [DONE] so the connection can be reused; read1()
+        # doesn't mark a Content-Length body finished, so close it explicitly
+        while response.read1(READ_SIZE):
+            pass
+        response.close()
+        if timing.status >= 400 and timing.error is None:
+            timing.error = f"HTTP {timing.status}"
+    finally:
+        timing.total = time.perf_counter() - started
+        if owned:
+            connection.close()
+    return timing
+
+def print_timing(timing):
+    print(f"📊 Response Status: {timing.status} ({timing.mode}, {timing.content_type})")
+    print(f"🔌 Connect: {_ms(timing.connect)} ms")
+    print(f"📥 First byte: {_ms(timing.first_byte)} ms")
+    print(f"💬 First token: {_ms(timing.first_token)} ms")
+    gaps = timing.gaps()
+    if gaps:
+        print(f"⏳ Inter-token gaps: mean {_ms(sum(gaps) / len(gaps))} ms, max {_ms(max(gaps))} ms "
+              f"over {len(timing.tokens)} tokens")
+    print(f"⏱️ Total: {_ms(timing.total)} ms ({timing.body_bytes} bytes)")
+    if timing.error:
+        print(f"❌ API Error: {timing.error}")
+    print(f"📄 Message: {timing.message}")
+    if timing.metadata:
+        print(f"🏷️ Metadata: {json.dumps(timing.metadata, ensure_ascii=False)}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Stream a chat API reply and time it")
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--message', default=DEFAULT_MESSAGE)
+    parser.add_argument('--user-id', default=DEFAULT_USER_ID)
+    parser.add_argument('--conversation-id')
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT_SECONDS)
+    parser.add_argument('--json', action='store_true', help="print the timings as JSON")
+    args = parser.parse_args()
+
+    payload = {'message': args.message, 'userId': args.user_id, 'conversationId': args.conversation_id}
+    timing = stream_chat(args.url, payload, args.timeout)
+    if args.json:
+        print(json.dumps(timing.as_dict(), ensure_ascii=False, indent=2))
+    else:
+        print_timing(timing)
+
+if __name__ == "__main__":
+    main()
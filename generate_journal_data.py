@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+High-volume synthetic journal generator for daily_entries.
+Produces N users x M days of morning and evening entries with the same columns
+as add_mock_data.py, streamed to JSONL, CSV or Postgres COPY text format.
+
+Symptoms are correlated: each user-day has a hidden severity that follows a
+Markov chain, and every entry is drawn from a joint distribution over the nine
+symptom flags, sleep quality, energy and mood conditioned on that severity.
+Draws are made a whole block at a time with random.choices, so the per-row
+Python work is just formatting.
+
+Usage:
+    python generate_journal_data.py --users 1000 --days 365 --format csv -o entries.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from itertools import product
+import random
+
+from journal_entries import (DB_MOODS as MOODS, DB_SLEEP_QUALITIES as SLEEP_QUALITIES,
+                             ENERGY_LEVELS, ENTRY_FIELDS, SYMPTOM_COLUMNS, TIMES_OF_DAY)
+
+# Only enum values accepted by the daily_entries CHECK constraints are generated
+COLUMNS = tuple(field for field in ENTRY_FIELDS if field != 'id')
+
+OUTPUT_FORMATS = ('jsonl', 'csv', 'copy')
+
+# Hidden day severity: 0 = good day ... 3 = hard day
+SEVERITY_START = (0.35, 0.35, 0.2, 0.1)
+SEVERITY_TRANSITIONS = (
+    (0.70, 0.22, 0.06, 0.02),
+    (0.25, 0.50, 0.20, 0.05),
+    (0.08, 0.27, 0.45, 0.20),
+    (0.04, 0.16, 0.35, 0.45),
+)
+
+DAILY_INSIGHTS = (
+    ('הרגשתי נהדר היום! שינה טובה ואנרגיה גבוהה', 'יום נהדר הסתיים. הרגשתי מאוזנת ושלווה',
+     'שינה מעולה אחרי אימון אתמול! הרגשה נהדרת'),
+    ('שינה בסדר, אבל יש לי יובש. מצב הרוח בסדר', 'יום טוב יותר. עדיין יש יובש אבל הרגשה כללית טובה',
+     'הרגשה טובה יותר היום. התסמינים פחתו ואני מרגישה יותר אופטימית'),
+    ('הרגשתי נפוחה וכואבת. קשה לי להתרכז', 'קשה לי להתרכז היום. הרגשה של ערפל במוח',
+     'עדיין נפוחה וכואבת. קשה לי להתרכז בעבודה'),
+    ('לילה קשה עם גלי חום והזעות לילה. התקשיתי לישון', 'יום קשה עם תסמינים רבים. הרגשה של חוסר שליטה',
+     'לילה קשה עם גלי חום, הזעות לילה, יובש ונפיחות. הרגשה רעה'),
+)
+
+ENTRY_HOURS = {'morning': 7, 'evening': 19}
+BLOCK_SIZE = 20000
+
+def _bit(mask, column):
+    return bool(mask >> SYMPTOM_COLUMNS.index(column) & 1)
+
+def _bernoulli(flag, p):
+    return p if flag else 1.0 - p
+
+def symptom_mask_probability(mask, severity, time_of_day):
+    """P(symptom mask | severity, time of day) under a small conditional model"""
+    hot = _bit(mask, 'hot_flashes')
+    sweats = _bit(mask, 'night_sweats')
+    woke = _bit(mask, 'woke_up_night')
+    sleep_issues = _bit(mask, 'sleep_issues')
+    pain = _bit(mask, 'pain')
+
+    p = _bernoulli(hot, (0.05, 0.25, 0.55, 0.80)[severity])
+    p *= _bernoulli(sweats, 0.60 if hot else 0.08)
+    # Waking up at night is reported in the morning entry
+    p *= _bernoulli(woke, (0.70 if sweats else 0.15) if time_of_day == 'morning' else 0.03)
+    p *= _bernoulli(sleep_issues, 0.75 if (woke or sweats) else 0.10)
+    p *= _bernoulli(_bit(mask, 'dryness'), (0.10, 0.20, 0.35, 0.50)[severity])
+    p *= _bernoulli(pain, (0.05, 0.15, 0.30, 0.45)[severity])
+    p *= _bernoulli(_bit(mask, 'bloating'), 0.60 if pain else (0.05, 0.12, 0.20, 0.30)[severity])
+    p *= _bernoulli(_bit(mask, 'concentration_difficulty'),
+                    0.60 if sleep_issues else (0.05, 0.10, 0.20, 0.30)[severity])
+    p *= _bernoulli(_bit(mask, 'sexual_desire'), (0.60, 0.40, 0.20, 0.10)[severity])
+    return p
+
+# P(sleep quality | number of night symptoms), P(energy | sleep quality)
+SLEEP_GIVEN_NIGHT_SCORE = ((0.05, 0.25, 0.70), (0.20, 0.50, 0.30), (0.50, 0.40, 0.10), (0.75, 0.20, 0.05))
+ENERGY_GIVEN_SLEEP = ((0.65, 0.30, 0.05), (0.25, 0.55, 0.20), (0.08, 0.40, 0.52))
+MOOD_GIVEN_SEVERITY = (
+    (0.40, 0.05, 0.05, 0.45, 0.05),
+    (0.40, 0.15, 0.10, 0.25, 0.10),
+    (0.20, 0.25, 0.20, 0.10, 0.25),
+    (0.10, 0.30, 0.25, 0.05, 0.30),
+)
+# Low energy pushes mood towards irritated/sad, high energy towards happy
+MOOD_ENERGY_FACTORS = (
+    (1.0, 1.5, 1.5, 0.5, 1.2),
+    (1.0, 1.0, 1.0, 1.0, 1.0),
+    (1.1, 0.6, 0.6, 1.6, 0.8),
+)
+
+def encode_outcome(mask, sleep, energy, mood):
+    """Pack one sampled outcome into an int: 9 symptom bits, then enum codes"""
+    return mask | sleep << 9 | energy << 11 | mood << 13
+
+def build_outcome_table(severity, time_of_day):
+    """Return (outcome codes, cumulative weights) for one severity/time of day"""
+    codes = []
+    cum_weights = []
+    total = 0.0
+    for mask in range(1 << len(SYMPTOM_COLUMNS)):
+        p_mask = symptom_mask_probability(mask, severity, time_of_day)
+        night_score = (_bit(mask, 'night_sweats') + _bit(mask, 'woke_up_night')
+                       + _bit(mask, 'sleep_issues'))
+        for sleep, energy, mood in product(range(3), range(3), range(len(MOODS))):
+            mood_weights = [w * f for w, f in zip(MOOD_GIVEN_SEVERITY[severity],
+                                                  MOOD_ENERGY_FACTORS[energy])]
+            p = (p_mask
+                 * SLEEP_GIVEN_NIGHT_SCORE[night_score][sleep]
+                 * ENERGY_GIVEN_SLEEP[sleep][energy]
+                 * mood_weights[mood] / sum(mood_weights))
+            total += p
+            codes.append(encode_outcome(mask, sleep, energy, mood))
+            cum_weights.append(total)
+    return codes, cum_weights
+
+def decode_outcome(code):
+    """Return the entry column values (sleep_quality ... sexual_desire) for a code"""
+    mask = code & 0x1FF
+    flags = {column: bool(mask >> i & 1) for i, column in enumerate(SYMPTOM_COLUMNS)}
+    return (
+        SLEEP_QUALITIES[code >> 9 & 0x3],
+        flags['woke_up_night'],
+        flags['night_sweats'],
+        ENERGY_LEVELS[code >> 11 & 0x3],
+        MOODS[code >> 13 & 0x7],
+        flags['hot_flashes'],
+        flags['dryness'],
+        flags['pain'],
+        flags['bloating'],
+        flags['concentration_difficulty'],
+        flags['sleep_issues'],
+        flags['sexual_desire'],
+    )
+
+class JournalGenerator:
+    """Seeded generator of daily_entries rows as tuples in COLUMNS order"""
+
+    def __init__(self, users, days, start_date, seed=0, block_size=BLOCK_SIZE, user_ids=None):
+        self.user_ids = list(user_ids) if user_ids else None
+        self.users = len(self.user_ids) if self.user_ids else users
+        self.days = days
+        self.start_date = start_date
+        self.block_size = block_size
+        self.rng = random.Random(seed)
+        self.tables = {
+            (severity, time_of_day): build_outcome_table(severity, time_of_day)
+            for severity in range(len(SEVERITY_START))
+            for time_of_day in TIMES_OF_DAY
+        }
+        self.decoded = {}
+
+    def _severity_days(self):
+        """Yield (user_id, day index, severity) following each user's Markov chain"""
+        rng = self.rng
+        levels = range(len(SEVERITY_START))
+        for n in range(self.users):
+            user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            if self.user_ids:
+                user_id = self.user_ids[n]
+            severity = rng.choices(levels, SEVERITY_START)[0]
+            for day in range(self.days):
+                yield user_id, day, severity
+                severity = rng.choices(levels, SEVERITY_TRANSITIONS[severity])[0]
+
+    def _sample_block(self, slots):
+        """Draw outcomes for a block of (user_id, day, time_of_day, severity) slots"""
+        rng = self.rng
+        groups = {}
+        for position, slot in enumerate(slots):
+            groups.setdefault((slot[3], slot[2]), []).append(position)
+        outcomes = [0] * len(slots)
+        insights = [None] * len(slots)
+        for (severity, time_of_day), positions in groups.items():
+            codes, cum_weights = self.tables[(severity, time_of_day)]
+            drawn = rng.choices(codes, cum_weights=cum_weights, k=len(positions))
+            texts = rng.choices(DAILY_INSIGHTS[severity], k=len(positions))
+            for position, code, text in zip(positions, drawn, texts):
+                outcomes[position] = code
+                insights[position] = text
+        minutes = rng.choices(range(120), k=len(slots))
+        return outcomes, insights, minutes
+
+    def _emit_block(self, slots):
+        outcomes, insights, minutes = self._sample_block(slots)
+        decoded = self.decoded
+        for slot, code, insight, minute in zip(slots, outcomes, insights, minutes):
+            user_id, day, time_of_day, _ = slot
+            values = decoded.get(code)
+            if values is None:
+                values = decoded[code] = decode_outcome(code)
+            entry_date = self.start_date + timedelta(days=day)
+            stamp = (f"{entry_date.isoformat()}T{ENTRY_HOURS[time_of_day] + minute // 60:02d}:"
+                     f"{minute % 60:02d}:00Z")
+            yield (user_id, entry_date.isoformat(), time_of_day) + values + (insight, stamp, stamp)
+
+    def rows(self):
+        """Yield rows, holding at most one block of slots in memory"""
+        slots = []
+        for user_id, day, severity in self._severity_days():
+            for time_of_day in TIMES_OF_DAY:
+                slots.append((user_id, day, time_of_day, severity))
+            if len(slots) >= self.block_size:
+                yield from self._emit_block(slots)
+                slots = []
+        if slots:
+            yield from self._emit_block(slots)
+
+def _copy_field(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def write_rows(rows, out, output_format):
+    """Stream rows to a text file object; returns the number of rows written"""
+    count = 0
+    if output_format == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(['true' if v is True else 'false' if v is False else v for v in row])
+            count += 1
+    elif output_format == 'jsonl':
+        for row in rows:
+            out.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False))
+            out.write('\n')
+            count += 1
+    elif output_format == 'copy':
+        # Load with: COPY daily_entries (<COLUMNS>) FROM STDIN
+        for row in rows:
+            out.write('\t'.join(map(_copy_field, row)))
+            out.write('\n')
+            count += 1
+    else:
+        raise ValueError(f"unknown output format {output_format!r}")
+    return count
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Generate synthetic daily_entries rows")
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='jsonl')
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = JournalGenerator(args.users, args.days, args.start_date, seed=args.seed)
+    started = time.perf_counter()
+    if args.output == '-':
+        count = write_rows(generator.rows(), sys.stdout, args.format)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            count = write_rows(generator.rows(), f, args.format)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Generated {count} entries in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
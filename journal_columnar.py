@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Binary columnar file format for journal entries (.jcol).
+Stores the packed JournalBatch columns on disk so analytics can open a large
+export without reparsing CSV/JSON text.
+
+Layout (all integers in the byte order recorded in the header):
+    8 bytes   magic b'JRNLCOL\\x01'
+    8 bytes   header length (little-endian u64)
+    header    UTF-8 JSON: row count, user id table, and for every section
+              its offset, byte length and array typecode
+    sections  8-byte aligned: one per fixed-width column (dates, enum codes,
+              symptom masks, timestamps and their format codes), and for
+              each string column (id, daily_insight) a u64 offsets array
+              (rows + 1), a validity byte per row and a UTF-8 heap.
+              Values kept verbatim (JournalBatch.overflow) are a string
+              column of JSON objects plus a u64 array of their row numbers.
+
+MappedJournal memory-maps the file and exposes each column as a memoryview,
+so opening takes milliseconds and only the pages a query touches are read.
+It is a read-only JournalBatch, so JournalSummary, PatternEngine and the
+dict conversion work on it unchanged.
+
+Usage:
+    python journal_columnar.py convert mock_journal_data.csv journal.jcol
+    python journal_columnar.py convert entries.jsonl journal.jcol
+    python journal_columnar.py info journal.jcol
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from journal_entries import DEFAULT_BATCH_SIZE, JournalBatch, entry_from_csv_row, iter_batches
+from journal_stream import iter_export_entries
+from journal_summary import JournalSummary
+
+MAGIC = b'JRNLCOL\x01'
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+
+# Fixed-width JournalBatch columns stored as-is
+FIXED_COLUMNS = {
+    'present': 'I',
+    'user': 'I',
+    'day': 'i',
+    'time_of_day': 'B',
+    'sleep_quality': 'B',
+    'energy_level': 'B',
+    'mood': 'B',
+    'symptoms': 'H',
+    'created_at': 'q',
+    'updated_at': 'q',
+    'created_at_format': 'I',
+    'updated_at_format': 'I',
+}
+# JournalBatch list attribute -> section name prefix
+STRING_COLUMNS = {'ids': 'id', 'daily_insight': 'daily_insight'}
+# Section name prefix of the overflow values; its row numbers go in 'overflow.rows'
+OVERFLOW = 'overflow'
+
+def iter_source_entries(path):
+    """(entries, export-level user) from a .csv, .json or .jsonl journal export"""
+    if path.endswith('.csv'):
+        def rows():
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                for row in csv.DictReader(f):
+                    yield entry_from_csv_row(row)
+        return rows(), None
+    return iter_export_entries(path)
+
+class ColumnarWriter:
+    """Writes JournalBatch objects to a .jcol file, spilling columns to temp files until close()"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.user_ids = []
+        self.user_codes = {}
+        self.spills = {}
+        for name in FIXED_COLUMNS:
+            self.spills[name] = tempfile.TemporaryFile()
+        for prefix in (*STRING_COLUMNS.values(), OVERFLOW):
+            for part in ('offsets', 'valid', 'heap'):
+                self.spills[f"{prefix}.{part}"] = tempfile.TemporaryFile()
+        self.spills[f"{OVERFLOW}.rows"] = tempfile.TemporaryFile()
+        self.heap_sizes = {prefix: 0 for prefix in (*STRING_COLUMNS.values(), OVERFLOW)}
+
+    def append_batch(self, batch):
+        # Batch-local user codes -> file-wide codes
+        remap = [0]
+        for user_id in batch.user_ids:
+            code = self.user_codes.get(user_id)
+            if code is None:
+                self.user_ids.append(user_id)
+                code = self.user_codes[user_id] = len(self.user_ids)
+            remap.append(code)
+        for name in FIXED_COLUMNS:
+            column = getattr(batch, name)
+            if name == 'user':
+                column = array('I', [remap[code] for code in column])
+            self.spills[name].write(column.tobytes())
+        for attribute, prefix in STRING_COLUMNS.items():
+            self._append_strings(prefix, getattr(batch, attribute))
+        rows = sorted(batch.overflow)
+        self.spills[f"{OVERFLOW}.rows"].write(array('Q', [self.rows + row for row in rows]).tobytes())
+        self._append_strings(OVERFLOW, [json.dumps(batch.overflow[row], ensure_ascii=False,
+                                                   separators=(',', ':')) for row in rows])
+        self.rows += len(batch)
+
+    def _append_strings(self, prefix, values):
+        offsets = array('Q')
+        valid = bytearray()
+        heap = bytearray()
+        position = self.heap_sizes[prefix]
+        for value in values:
+            offsets.append(position + len(heap))
+            if value is None:
+                valid.append(0)
+            else:
+                valid.append(1)
+                heap += value.encode('utf-8')
+        self.heap_sizes[prefix] = position + len(heap)
+        self.spills[f"{prefix}.offsets"].write(offsets.tobytes())
+        self.spills[f"{prefix}.valid"].write(valid)
+        self.spills[f"{prefix}.heap"].write(heap)
+
+    def close(self):
+        """Lay out the header and sections and write the file atomically"""
+        for prefix, size in self.heap_sizes.items():
+            self.spills[f"{prefix}.offsets"].write(array('Q', [size]).tobytes())
+        typecodes = dict(FIXED_COLUMNS)
+        for prefix in (*STRING_COLUMNS.values(), OVERFLOW):
+            typecodes.update({f"{prefix}.offsets": 'Q', f"{prefix}.valid": 'B', f"{prefix}.heap": 'B'})
+        typecodes[f"{OVERFLOW}.rows"] = 'Q'
+
+        sections = {}
+        header = {
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'rows': self.rows,
+            'user_ids': self.user_ids,
+            'sections': sections,
+        }
+        # Section offsets depend on the header length, which depends on the offsets
+        header_length = 0
+        while True:
+            offset = _align(len(MAGIC) + 8 + header_length)
+            for name, spill in self.spills.items():
+                length = spill.seek(0, os.SEEK_END)
+                sections[name] = {'offset': offset, 'length': length, 'typecode': typecodes[name],
+                                  'itemsize': array(typecodes[name]).itemsize}
+                offset = _align(offset + length)
+            encoded = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            if len(encoded) == header_length:
+                break
+            header_length = len(encoded)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as out:
+            out.write(MAGIC)
+            out.write(header_length.to_bytes(8, 'little'))
+            out.write(encoded)
+            for name, spill in self.spills.items():
+                out.write(bytes(sections[name]['offset'] - out.tell()))
+                spill.seek(0)
+                shutil.copyfileobj(spill, out)
+                spill.close()
+        os.replace(tmp_path, self.path)
+        return self.rows
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def convert(source, destination, batch_size=DEFAULT_BATCH_SIZE):
+    """Convert a .csv/.json/.jsonl export to .jcol; returns the number of rows"""
+    entries, _ = iter_source_entries(source)
+    writer = ColumnarWriter(destination)
+    for batch in iter_batches(entries, batch_size):
+        writer.append_batch(batch)
+    return writer.close()
+
+class StringColumn:
+    """Read-only sequence of strings backed by an offsets array, validity bytes and a UTF-8 heap"""
+
+    def __init__(self, offsets, valid, heap):
+        self.offsets = offsets
+        self.valid = valid
+        self.heap = heap
+
+    def __len__(self):
+        return len(self.valid)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not self.valid[row]:
+            return None
+        return str(self.heap[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+class OverflowColumn(Mapping):
+    """Read-only {row: overflow dict} over sorted row numbers and a StringColumn of JSON"""
+
+    def __init__(self, rows, column):
+        self.rows = rows
+        self.column = column
+
+    def _position(self, row):
+        position = bisect_left(self.rows, row)
+        if position < len(self.rows) and self.rows[position] == row:
+            return position
+        return None
+
+    def __getitem__(self, row):
+        position = self._position(row)
+        if position is None:
+            raise KeyError(row)
+        return json.loads(self.column[position])
+
+    def get(self, row, default=None):
+        # JournalBatch.packed() calls this for every row; skip the KeyError
+        position = self._position(row)
+        return default if position is None else json.loads(self.column[position])
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+class MappedJournal(JournalBatch):
+    """Read-only JournalBatch over a memory-mapped .jcol file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a journal columnar file")
+        header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        start = len(MAGIC) + 8
+        header = json.loads(self._mmap[start:start + header_length])
+        if header['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported journal columnar version: {header['version']}")
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{self.path} was written on a {header['byteorder']}-endian machine")
+        self.rows = header['rows']
+        self.user_ids = header['user_ids']
+        self.user_codes = {user_id: i + 1 for i, user_id in enumerate(self.user_ids)}
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+
+        def section(name):
+            info = header['sections'][name]
+            if array(info['typecode']).itemsize != info['itemsize']:
+                raise ValueError(f"Column {name} has an unsupported item size")
+            view = buffer[info['offset']:info['offset'] + info['length']].cast(info['typecode'])
+            self._views.append(view)
+            return view
+
+        for name in FIXED_COLUMNS:
+            setattr(self, name, section(name))
+        for attribute, prefix in STRING_COLUMNS.items():
+            setattr(self, attribute, StringColumn(section(f"{prefix}.offsets"),
+                                                  section(f"{prefix}.valid"),
+                                                  section(f"{prefix}.heap")))
+        self.overflow = OverflowColumn(section(f"{OVERFLOW}.rows"),
+                                       StringColumn(section(f"{OVERFLOW}.offsets"),
+                                                    section(f"{OVERFLOW}.valid"),
+                                                    section(f"{OVERFLOW}.heap")))
+
+    def __len__(self):
+        return self.rows
+
+    def append_packed(self, packed):
+        raise TypeError("MappedJournal is read-only")
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Journal columnar (.jcol) files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert_parser = commands.add_parser('convert', help="convert a .csv/.json/.jsonl export")
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('destination')
+    info_parser = commands.add_parser('info', help="open a .jcol file and summarize it")
+    info_parser.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        started = time.perf_counter()
+        rows = convert(args.source, args.destination)
+        elapsed = time.perf_counter() - started
+        print(f"✅ Wrote {rows} entries to {args.destination} "
+              f"({os.path.getsize(args.destination):,} bytes) in {elapsed:.2f}s")
+        return
+
+    started = time.perf_counter()
+    with MappedJournal(args.path) as journal:
+        opened = time.perf_counter()
+        summary = JournalSummary().update(journal).as_dict()
+        summarized = time.perf_counter()
+        print(f"📂 {args.path}: {len(journal)} entries, {len(journal.user_ids)} users")
+        print(f"   Opened in {(opened - started) * 1000:.1f} ms, summarized in "
+              f"{(summarized - opened) * 1000:.1f} ms")
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
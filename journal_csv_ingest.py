@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Parallel ingestion of daily_entries CSV exports (mock_journal_data.csv shape).
+Splits the file into byte ranges that start and end on record boundaries,
+parses the ranges in a process pool into JournalBatch columns, and merges the
+batches back in file order.
+
+A newline is a record boundary when it is outside a quoted field. CSV escapes
+a quote inside a quoted field by doubling it, so a position is inside quotes
+exactly when an odd number of '"' bytes precede it; the splitter finds
+boundaries by counting quote bytes in slices of a memory map, without
+parsing the file.
+Quoted daily_insight text with commas or line breaks stays in one chunk.
+
+Usage:
+    python journal_csv_ingest.py export.csv --workers 8
+    python journal_csv_ingest.py export.csv --workers 8 --output export.jcol
+"""
+
+import argparse
+import csv
+import io
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from journal_columnar import ColumnarWriter
+from journal_entries import JournalBatch, entry_from_csv_row
+
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_BYTES = 1 << 20
+
+def _next_boundary(data, position, quotes_before, counted_to):
+    """First record boundary at or after `position`.
+
+    `quotes_before` is the number of quote bytes in data[:counted_to]. Returns
+    (boundary, quotes in data[:boundary]); the boundary is len(data) if the
+    file ends first.
+    """
+    search = max(position, counted_to)
+    while True:
+        newline = data.find(b'\n', search)
+        if newline == -1:
+            return len(data), quotes_before + data[counted_to:].count(b'"')
+        quotes_before += data[counted_to:newline + 1].count(b'"')
+        counted_to = newline + 1
+        if quotes_before % 2 == 0:
+            return newline + 1, quotes_before
+        search = newline + 1
+
+def split_records(path, chunks):
+    """(header fields, [(start, end), ...]) byte ranges of whole records after the header"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end, quotes = _next_boundary(data, 0, 0, 0)
+            header_text = data[:header_end].decode('utf-8-sig')
+            header = next(csv.reader(io.StringIO(header_text, newline='')), [])
+            ranges = []
+            start = header_end
+            body = size - header_end
+            for k in range(1, chunks + 1):
+                target = header_end + body * k // chunks
+                if target <= start and k < chunks:
+                    continue
+                end, quotes = _next_boundary(data, target, quotes, start) if k < chunks else (size, quotes)
+                if end > start:
+                    ranges.append((start, end))
+                    start = end
+            return header, ranges
+
+def parse_range(path, header, start, end):
+    """Parse data[start:end] (whole records) into a JournalBatch"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    batch = JournalBatch()
+    for row in csv.reader(io.StringIO(text, newline='')):
+        if row:
+            batch.append(entry_from_csv_row(dict(zip(header, row))))
+    return batch
+
+def _parse_range_task(task):
+    return parse_range(*task)
+
+def iter_csv_batches(path, workers=None, chunks=None):
+    """Yield JournalBatch objects for the file's records, in file order"""
+    workers = workers or os.cpu_count() or 1
+    if chunks is not None and chunks < 1:
+        raise ValueError(f"chunks must be at least 1, got {chunks}")
+    if chunks is None:
+        size = os.path.getsize(path)
+        chunks = max(1, min(workers * CHUNKS_PER_WORKER, size // MIN_CHUNK_BYTES))
+    header, ranges = split_records(path, chunks)
+    tasks = [(path, header, start, end) for start, end in ranges]
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _parse_range_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() returns results in submission order, i.e. file order
+        yield from executor.map(_parse_range_task, tasks)
+
+def ingest_csv(path, workers=None, chunks=None):
+    """Parse a CSV export into one JournalBatch"""
+    merged = JournalBatch()
+    for batch in iter_csv_batches(path, workers, chunks):
+        merged.append_batch(batch)
+    return merged
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Parse a daily_entries CSV export in parallel")
+    parser.add_argument('path')
+    parser.add_argument('--workers', type=int, default=0, help="worker processes (0 = one per CPU)")
+    parser.add_argument('--chunks', type=positive_int, help="byte ranges to split into (default 4 per worker)")
+    parser.add_argument('--output', help="write the merged entries to this .jcol file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.output:
+        writer = ColumnarWriter(args.output)
+        for batch in iter_csv_batches(args.path, args.workers or None, args.chunks):
+            writer.append_batch(batch)
+        rows = writer.close()
+    else:
+        rows = len(ingest_csv(args.path, args.workers or None, args.chunks))
+    elapsed = time.perf_counter() - started
+    megabytes = os.path.getsize(args.path) / (1 << 20)
+    print(f"✅ Parsed {rows} entries from {args.path} in {elapsed:.2f}s "
+          f"({rows / elapsed:,.0f} rows/s, {megabytes / elapsed:.1f} MB/s)")
+    if args.output:
+        print(f"💾 Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Shared journal-entry definitions and compact in-memory representations.
+
+The journal scripts pass entries around as dicts of ~20 string keys (see
+add_mock_data.py and mock_journal_data.json). This module packs them instead:
+the nine boolean symptoms go into one bitmask, the enums into small integer
+codes, dates and timestamps into ints, and user ids into a shared table.
+Timestamps are epoch microseconds plus a format code (separator, fraction
+digits, UTC offset and its spelling), so both '2025-01-15T08:00:00Z' and
+Supabase's '2025-01-15T08:00:00.123456+00:00' pack exactly.
+
+- JournalEntry is a __slots__ record for one entry.
+- JournalBatch stores many entries column by column in array.array buffers.
+
+Both convert losslessly to and from the dict shape: the set of keys present is
+recorded, and any value the packed columns can't represent exactly (an unknown
+mood, a non-canonical date, extra columns such as sleep_hours) is kept as-is
+in a small per-entry overflow dict.
+"""
+
+import re
+import sys
+from array import array
+from datetime import date
+from functools import lru_cache
+from itertools import islice, product
+
+# Bit i of a symptom mask is SYMPTOM_COLUMNS[i]
+SYMPTOM_COLUMNS = (
+    'hot_flashes', 'night_sweats', 'dryness', 'pain', 'bloating',
+    'concentration_difficulty', 'sleep_issues', 'woke_up_night', 'sexual_desire',
+)
+SYMPTOM_BITS = {column: 1 << i for i, column in enumerate(SYMPTOM_COLUMNS)}
+
+# Values allowed by the daily_entries CHECK constraints
+DB_SLEEP_QUALITIES = ('poor', 'fair', 'good')
+DB_MOODS = ('calm', 'irritated', 'sad', 'happy', 'frustrated')
+
+# Everything the tooling may see, DB values first. Code 0 means "None".
+TIMES_OF_DAY = ('morning', 'evening')
+SLEEP_QUALITIES = DB_SLEEP_QUALITIES + ('excellent',)
+ENERGY_LEVELS = ('low', 'medium', 'high')
+MOODS = DB_MOODS + ('content', 'tired', 'neutral', 'uncomfortable', 'foggy', 'irritable', 'hopeful')
+
+ENUM_VALUES = {
+    'time_of_day': TIMES_OF_DAY,
+    'sleep_quality': SLEEP_QUALITIES,
+    'energy_level': ENERGY_LEVELS,
+    'mood': MOODS,
+}
+ENUM_CODES = {field: {value: i + 1 for i, value in enumerate(values)}
+              for field, values in ENUM_VALUES.items()}
+
+# Canonical key order of an entry dict (both existing shapes follow it)
+ENTRY_FIELDS = (
+    'id', 'user_id', 'date', 'time_of_day', 'sleep_quality', 'woke_up_night', 'night_sweats',
+    'energy_level', 'mood', 'hot_flashes', 'dryness', 'pain', 'bloating',
+    'concentration_difficulty', 'sleep_issues', 'sexual_desire', 'daily_insight',
+    'created_at', 'updated_at',
+)
+FIELD_BITS = {field: 1 << i for i, field in enumerate(ENTRY_FIELDS)}
+
+_CLOCK_PATTERN = re.compile(r'(\d\d):(\d\d):(\d\d)\Z', re.ASCII)
+_TIMESTAMP_PATTERN = re.compile(
+    r'(\d{4}-\d\d-\d\d)([T ])(\d\d:\d\d:\d\d)(?:\.(\d{1,6}))?(?:(Z)|([+-])(\d\d)(:?)(\d\d)?)\Z', re.ASCII)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Stored in timestamp columns when the value is missing
+MISSING_TIMESTAMP = -(1 << 63)
+# Timestamp format codes: bits 0-1 offset spelling (index into _OFFSET_STYLES),
+# bit 2 a space instead of 'T', bits 3-5 fraction digits, bits 6-17 the UTC
+# offset in minutes (12-bit two's complement). 0 is 'YYYY-MM-DDTHH:MM:SSZ'.
+_OFFSET_STYLES = ('Z', '+HH:MM', '+HHMM', '+HH')
+_SPACE_SEPARATOR = 1 << 2
+_DIGITS_SHIFT = 3
+_OFFSET_SHIFT = 6
+
+@lru_cache(maxsize=1 << 16)
+def _encode_date_string(value):
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return day.toordinal() if day.isoformat() == value else None
+
+def encode_date(value):
+    """'YYYY-MM-DD' -> proleptic ordinal, or None if it wouldn't round-trip"""
+    if not isinstance(value, str) or len(value) != 10:
+        return None
+    return _encode_date_string(value)
+
+def decode_date(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+@lru_cache(maxsize=1 << 17)
+def _clock_seconds(clock):
+    match = _CLOCK_PATTERN.match(clock)
+    if not match:
+        return None
+    hours, minutes, seconds = map(int, match.groups())
+    if hours > 23 or minutes > 59 or seconds > 59:
+        return None
+    return hours * 3600 + minutes * 60 + seconds
+
+def encode_timestamp(value):
+    """ISO-8601 timestamp -> (epoch microseconds, format code), or None if it wouldn't round-trip.
+
+    Takes 'YYYY-MM-DDTHH:MM:SS' (or a space instead of 'T'), an optional
+    fraction of up to 6 digits and 'Z' or a +HH:MM, +HHMM or +HH offset.
+    """
+    if not isinstance(value, str):
+        return None
+    if len(value) == 20 and value[10] == 'T' and value[19] == 'Z':
+        ordinal = encode_date(value[:10])
+        seconds = _clock_seconds(value[11:19])
+        if ordinal is None or seconds is None:
+            return None
+        return ((ordinal - _EPOCH_ORDINAL) * 86400 + seconds) * 1_000_000, 0
+    match = _TIMESTAMP_PATTERN.match(value)
+    if not match:
+        return None
+    day, separator, clock, fraction, zulu, sign, offset_hours, colon, offset_minutes = match.groups()
+    ordinal = encode_date(day)
+    seconds = _clock_seconds(clock)
+    if ordinal is None or seconds is None:
+        return None
+    if zulu:
+        style, offset = 0, 0
+    else:
+        if colon and not offset_minutes:
+            return None
+        style = 1 if colon else 2 if offset_minutes else 3
+        offset = int(offset_hours) * 60 + int(offset_minutes or 0)
+        # '-00:00' would come back as '+00:00'
+        if int(offset_hours) > 23 or int(offset_minutes or 0) > 59 or (sign == '-' and not offset):
+            return None
+        if sign == '-':
+            offset = -offset
+    digits = len(fraction) if fraction else 0
+    micros = int(fraction.ljust(6, '0')) if fraction else 0
+    epoch_seconds = (ordinal - _EPOCH_ORDINAL) * 86400 + seconds - offset * 60
+    code = (style | (_SPACE_SEPARATOR if separator == ' ' else 0) | digits << _DIGITS_SHIFT
+            | (offset & 0xFFF) << _OFFSET_SHIFT)
+    return epoch_seconds * 1_000_000 + micros, code
+
+def decode_timestamp(epoch_micros, code=0):
+    """Inverse of encode_timestamp"""
+    offset = (code >> _OFFSET_SHIFT) & 0xFFF
+    if offset >= 0x800:
+        offset -= 0x1000
+    seconds, micros = divmod(epoch_micros, 1_000_000)
+    days, rest = divmod(seconds + offset * 60, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    separator = ' ' if code & _SPACE_SEPARATOR else 'T'
+    text = f"{decode_date(days + _EPOCH_ORDINAL)}{separator}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    digits = (code >> _DIGITS_SHIFT) & 0b111
+    if digits:
+        text += '.' + f"{micros:06d}"[:digits]
+    style = _OFFSET_STYLES[code & 0b11]
+    if style == 'Z':
+        return text + 'Z'
+    sign = '-' if offset < 0 else '+'
+    offset_hours, offset_minutes = divmod(abs(offset), 60)
+    if style == '+HH:MM':
+        return f"{text}{sign}{offset_hours:02d}:{offset_minutes:02d}"
+    if style == '+HHMM':
+        return f"{text}{sign}{offset_hours:02d}{offset_minutes:02d}"
+    return f"{text}{sign}{offset_hours:02d}"
+
+# Packed (epoch microseconds, format code) of a missing timestamp
+_MISSING_STAMP = (MISSING_TIMESTAMP, 0)
+
+# Entries per JournalBatch when packing a plain iterable in pieces
+DEFAULT_BATCH_SIZE = 50000
+
+# Mask for every all-bool combination of the symptom flags, in SYMPTOM_COLUMNS order
+_SYMPTOM_MASKS = {
+    flags: sum(1 << i for i, flag in enumerate(flags) if flag)
+    for flags in product((False, True), repeat=len(SYMPTOM_COLUMNS))
+}
+_ENUM_FIELDS = tuple(ENUM_CODES.items())
+_MAX_LAYOUTS = 1024
+_layouts = {}
+
+def _layout(keys):
+    """(present bitmask, unknown keys) for an entry's key tuple; entries mostly share a few"""
+    layout = _layouts.get(keys)
+    if layout is None:
+        present = 0
+        unknown = []
+        for key in keys:
+            if key in FIELD_BITS:
+                present |= FIELD_BITS[key]
+            else:
+                unknown.append(key)
+        layout = (present, tuple(unknown))
+        if len(_layouts) < _MAX_LAYOUTS:
+            _layouts[keys] = layout
+    return layout
+
+def pack_entry(entry):
+    """Pack an entry dict.
+
+    Returns (present, id, user_id, day, time_of_day, sleep_quality,
+    energy_level, mood, symptoms, daily_insight, created_at, updated_at,
+    created_at_format, updated_at_format, overflow) where overflow is None
+    or a dict of values kept verbatim.
+    """
+    present, unknown = _layout(tuple(entry))
+    overflow = {key: entry[key] for key in unknown} if unknown else None
+
+    flags = tuple(map(entry.get, SYMPTOM_COLUMNS))
+    symptoms = _SYMPTOM_MASKS.get(flags)
+    # The lookup also matches 0/1, so make sure every flag really is a bool
+    if symptoms is None or set(map(type, flags)) != {bool}:
+        symptoms = 0
+        for i, column in enumerate(SYMPTOM_COLUMNS):
+            if column not in entry or entry[column] is False:
+                continue
+            if entry[column] is True:
+                symptoms |= 1 << i
+            else:
+                overflow = overflow or {}
+                overflow[column] = entry[column]
+
+    codes = []
+    for field, field_codes in _ENUM_FIELDS:
+        value = entry.get(field)
+        code = 0 if value is None else field_codes.get(value)
+        if code is None:
+            overflow = overflow or {}
+            overflow[field] = value
+            code = 0
+        codes.append(code)
+
+    value = entry.get('date')
+    day = 0 if value is None else encode_date(value)
+    if day is None:
+        overflow = overflow or {}
+        overflow['date'] = value
+        day = 0
+    value = entry.get('created_at')
+    created_at = _MISSING_STAMP if value is None else encode_timestamp(value)
+    if created_at is None:
+        overflow = overflow or {}
+        overflow['created_at'] = value
+        created_at = _MISSING_STAMP
+    value = entry.get('updated_at')
+    updated_at = _MISSING_STAMP if value is None else encode_timestamp(value)
+    if updated_at is None:
+        overflow = overflow or {}
+        overflow['updated_at'] = value
+        updated_at = _MISSING_STAMP
+
+    return (present, entry.get('id'), entry.get('user_id'), day, *codes, symptoms,
+            entry.get('daily_insight'), created_at[0], updated_at[0], created_at[1], updated_at[1],
+            overflow)
+
+def unpack_entry(present, entry_id, user_id, day, time_of_day, sleep_quality, energy_level,
+                 mood, symptoms, daily_insight, created_at, updated_at, created_at_format,
+                 updated_at_format, overflow):
+    """Inverse of pack_entry: rebuild the dict with keys in ENTRY_FIELDS order"""
+    values = {
+        'id': entry_id,
+        'user_id': user_id,
+        'date': decode_date(day) if day else None,
+        'time_of_day': TIMES_OF_DAY[time_of_day - 1] if time_of_day else None,
+        'sleep_quality': SLEEP_QUALITIES[sleep_quality - 1] if sleep_quality else None,
+        'energy_level': ENERGY_LEVELS[energy_level - 1] if energy_level else None,
+        'mood': MOODS[mood - 1] if mood else None,
+        'daily_insight': daily_insight,
+        'created_at': (decode_timestamp(created_at, created_at_format)
+                       if created_at != MISSING_TIMESTAMP else None),
+        'updated_at': (decode_timestamp(updated_at, updated_at_format)
+                       if updated_at != MISSING_TIMESTAMP else None),
+    }
+    entry = {}
+    for field in ENTRY_FIELDS:
+        if not present & FIELD_BITS[field]:
+            continue
+        if overflow and field in overflow:
+            entry[field] = overflow[field]
+        elif field in SYMPTOM_BITS:
+            entry[field] = bool(symptoms & SYMPTOM_BITS[field])
+        else:
+            entry[field] = values[field]
+    if overflow:
+        for field, value in overflow.items():
+            if field not in FIELD_BITS:
+                entry[field] = value
+    return entry
+
+class JournalEntry:
+    """One journal entry with symptoms in a bitmask and enums as small ints"""
+
+    __slots__ = ('present', 'id', 'user_id', 'day', 'time_of_day', 'sleep_quality',
+                 'energy_level', 'mood', 'symptoms', 'daily_insight', 'created_at',
+                 'updated_at', 'created_at_format', 'updated_at_format', 'overflow')
+
+    def __init__(self, present, entry_id, user_id, day, time_of_day, sleep_quality,
+                 energy_level, mood, symptoms, daily_insight, created_at, updated_at,
+                 created_at_format=0, updated_at_format=0, overflow=None):
+        self.present = present
+        self.id = entry_id
+        self.user_id = user_id
+        self.day = day
+        self.time_of_day = time_of_day
+        self.sleep_quality = sleep_quality
+        self.energy_level = energy_level
+        self.mood = mood
+        self.symptoms = symptoms
+        self.daily_insight = daily_insight
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.created_at_format = created_at_format
+        self.updated_at_format = updated_at_format
+        self.overflow = overflow
+
+    @classmethod
+    def from_dict(cls, entry):
+        packed = pack_entry(entry)
+        if packed[2] is not None:
+            packed = packed[:2] + (sys.intern(packed[2]),) + packed[3:]
+        return cls(*packed)
+
+    def to_dict(self):
+        return unpack_entry(*(getattr(self, slot) for slot in self.__slots__))
+
+    def has(self, symptom):
+        """True if the symptom flag is set"""
+        return bool(self.symptoms & SYMPTOM_BITS[symptom])
+
+    def __eq__(self, other):
+        if not isinstance(other, JournalEntry):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __repr__(self):
+        return f"JournalEntry({self.to_dict()!r})"
+
+class JournalBatch:
+    """Column-oriented store of many journal entries.
+
+    Fixed-width fields live in array.array columns; user ids are
+    dictionary-encoded into `user_ids`; ids and insights stay as lists.
+    `overflow` maps row number -> dict of values kept verbatim.
+    """
+
+    def __init__(self):
+        self.present = array('I')
+        self.ids = []
+        self.user_ids = []
+        self.user_codes = {}
+        self.user = array('I')          # index into user_ids + 1, 0 = missing
+        self.day = array('i')           # date ordinal, 0 = missing
+        self.time_of_day = array('B')
+        self.sleep_quality = array('B')
+        self.energy_level = array('B')
+        self.mood = array('B')
+        self.symptoms = array('H')
+        self.daily_insight = []
+        self.created_at = array('q')       # epoch microseconds
+        self.updated_at = array('q')
+        self.created_at_format = array('I')   # encode_timestamp format codes
+        self.updated_at_format = array('I')
+        self.overflow = {}
+
+    @classmethod
+    def from_dicts(cls, entries):
+        batch = cls()
+        batch.extend(entries)
+        return batch
+
+    def __len__(self):
+        return len(self.present)
+
+    def _user_code(self, user_id):
+        if user_id is None:
+            return 0
+        code = self.user_codes.get(user_id)
+        if code is None:
+            self.user_ids.append(user_id)
+            code = self.user_codes[user_id] = len(self.user_ids)
+        return code
+
+    def append_packed(self, packed):
+        """Append a pack_entry() tuple"""
+        (present, entry_id, user_id, day, time_of_day, sleep_quality, energy_level, mood,
+         symptoms, daily_insight, created_at, updated_at, created_at_format, updated_at_format,
+         overflow) = packed
+        if overflow:
+            self.overflow[len(self.present)] = overflow
+        self.present.append(present)
+        self.ids.append(entry_id)
+        self.user.append(self._user_code(user_id))
+        self.day.append(day)
+        self.time_of_day.append(time_of_day)
+        self.sleep_quality.append(sleep_quality)
+        self.energy_level.append(energy_level)
+        self.mood.append(mood)
+        self.symptoms.append(symptoms)
+        self.daily_insight.append(daily_insight)
+        self.created_at.append(created_at)
+        self.updated_at.append(updated_at)
+        self.created_at_format.append(created_at_format)
+        self.updated_at_format.append(updated_at_format)
+
+    def append(self, entry):
+        self.append_packed(pack_entry(entry))
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append_packed(pack_entry(entry))
+
+    def append_batch(self, other):
+        """Append every row of another JournalBatch, re-coding its user ids"""
+        offset = len(self)
+        remap = [0] + [self._user_code(user_id) for user_id in other.user_ids]
+        self.present.extend(other.present)
+        self.ids.extend(other.ids)
+        self.user.extend(array('I', [remap[code] for code in other.user]))
+        self.day.extend(other.day)
+        self.time_of_day.extend(other.time_of_day)
+        self.sleep_quality.extend(other.sleep_quality)
+        self.energy_level.extend(other.energy_level)
+        self.mood.extend(other.mood)
+        self.symptoms.extend(other.symptoms)
+        self.daily_insight.extend(other.daily_insight)
+        self.created_at.extend(other.created_at)
+        self.updated_at.extend(other.updated_at)
+        self.created_at_format.extend(other.created_at_format)
+        self.updated_at_format.extend(other.updated_at_format)
+        for row, values in other.overflow.items():
+            self.overflow[offset + row] = values
+
+    def packed(self, row):
+        """Return row as a pack_entry() tuple"""
+        user = self.user[row]
+        return (self.present[row], self.ids[row], self.user_ids[user - 1] if user else None,
+                self.day[row], self.time_of_day[row], self.sleep_quality[row],
+                self.energy_level[row], self.mood[row], self.symptoms[row],
+                self.daily_insight[row], self.created_at[row], self.updated_at[row],
+                self.created_at_format[row], self.updated_at_format[row], self.overflow.get(row))
+
+    def entry(self, row):
+        return JournalEntry(*self.packed(row))
+
+    def __getitem__(self, row):
+        return unpack_entry(*self.packed(row))
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield unpack_entry(*self.packed(row))
+
+    def to_dicts(self):
+        return list(self)
+
+def iter_batches(entries, batch_size=DEFAULT_BATCH_SIZE):
+    """Pack an iterable of entry dicts into JournalBatch objects of up to batch_size rows"""
+    entries = iter(entries)
+    while True:
+        batch = JournalBatch.from_dicts(islice(entries, batch_size))
+        if not len(batch):
+            return
+        yield batch
+
+# Spellings of booleans in CSV exports (Supabase writes true/false, psql t/f)
+CSV_BOOLEANS = {'true': True, 't': True, '1': True, 'false': False, 'f': False, '0': False}
+
+def entry_from_csv_row(row):
+    """Entry dict from a csv.DictReader row shaped like mock_journal_data.csv.
+
+    Empty cells become None and symptom flags become bools; anything else
+    stays a string.
+    """
+    entry = {}
+    for key, value in row.items():
+        if value == '' or value is None:
+            entry[key] = None
+        elif key in SYMPTOM_BITS:
+            entry[key] = CSV_BOOLEANS.get(value.lower(), value)
+        else:
+            entry[key] = value
+    return entry
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes over loaded journal entries.
+Answers questions like "entries with hot_flashes between two dates for user X"
+without scanning every entry.
+
+JournalIndex builds, from a JournalBatch (or a memory-mapped .jcol file):
+- a date index: row numbers sorted by (user, date, time of day), with each
+  user's slice bounds, plus a global one sorted by (date, time of day)
+- a bitmap per symptom and per enum value (packed ints, bit r = row r)
+
+A query with a user or date range binary-searches the date index and checks
+the k candidate rows against the bitmaps: O(log n + k). A query on bitmaps
+alone ANDs them (64 rows per machine word) and walks the set bits.
+
+Usage:
+    python journal_index.py --file mock_journal_data.json --symptom hot_flashes --sleep poor
+    python journal_index.py --file journal.jcol --user <user_id> --from 2025-03-01 --to 2025-03-31 \\
+        --symptom night_sweats
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import islice
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from journal_columnar import MappedJournal, iter_source_entries
+from journal_entries import ENUM_VALUES, SYMPTOM_COLUMNS, JournalBatch, encode_date, iter_batches
+from journal_patterns import code_bitsets, symptom_bitsets
+
+_NONZERO_RUNS = re.compile(rb'[^\x00]+')
+# Shifts that order (user, day, time_of_day) in one int key
+_DAY_BITS = 22
+_TIME_BITS = 2
+
+def iter_set_bits(bitset):
+    """Row numbers of the set bits of a bitset int, ascending"""
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+    for run in _NONZERO_RUNS.finditer(data):
+        for i in range(run.start(), run.end()):
+            byte = data[i]
+            while byte:
+                low = byte & -byte
+                yield i * 8 + low.bit_length() - 1
+                byte ^= low
+
+class JournalIndex:
+    """Date and bitmap indexes over a JournalBatch"""
+
+    def __init__(self, batch, default_user=None):
+        self.batch = batch
+        self.default_user = default_user
+        rows = len(batch)
+        self.all_rows = (1 << rows) - 1
+        self.bitmaps = {}
+        for column, bitset in zip(SYMPTOM_COLUMNS, symptom_bitsets(batch.symptoms)):
+            self.bitmaps[column] = bitset
+        for field, values in ENUM_VALUES.items():
+            for value, bitset in zip(values, code_bitsets(getattr(batch, field), values)):
+                self.bitmaps[(field, value)] = bitset
+        self._bitmap_bytes = {}
+
+        users, days, times = batch.user, batch.day, batch.time_of_day
+        day_keys = [(days[row] << _TIME_BITS) | times[row] for row in range(rows)]
+        user_keys = [(users[row] << (_DAY_BITS + _TIME_BITS)) | key for row, key in enumerate(day_keys)]
+
+        order = sorted(range(rows), key=user_keys.__getitem__)
+        self.user_rows = array('I', order)
+        self.user_days = array('i', [days[row] for row in order])
+        # Rows are grouped by user code in ascending order, so bounds are prefix sums
+        self.user_bounds = {}
+        start = 0
+        for code, count in sorted(Counter(users).items()):
+            self.user_bounds[code] = (start, start + count)
+            start += count
+
+        order = sorted(range(rows), key=day_keys.__getitem__)
+        self.date_rows = array('I', order)
+        self.date_days = array('i', [days[row] for row in order])
+
+    @classmethod
+    def from_entries(cls, entries, default_user=None):
+        batch = JournalBatch()
+        for part in iter_batches(entries):
+            batch.append_batch(part)
+        return cls(batch, default_user)
+
+    def _user_code(self, user_id):
+        code = self.batch.user_codes.get(user_id)
+        if code is None and user_id == self.default_user:
+            code = 0
+        return code
+
+    def _probe(self, key):
+        """Bitmap as bytes, for O(1) checks of single rows"""
+        data = self._bitmap_bytes.get(key)
+        if data is None:
+            data = self._bitmap_bytes[key] = self.bitmaps[key].to_bytes(len(self.batch) // 8 + 1, 'little')
+        return data
+
+    def _conditions(self, symptoms, filters):
+        """[(bitmap, probe bytes or None)] for each condition; enum value lists are ORed"""
+        conditions = []
+        for symptom in symptoms:
+            if symptom not in self.bitmaps:
+                raise ValueError(f"Unknown symptom: {symptom}")
+            conditions.append((self.bitmaps[symptom], symptom))
+        for field, wanted in filters.items():
+            if wanted is None:
+                continue
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            unknown = [value for value in values if (field, value) not in self.bitmaps]
+            if unknown:
+                raise ValueError(f"Unknown {field} value(s): {', '.join(map(str, unknown))}")
+            if len(values) == 1:
+                conditions.append((self.bitmaps[(field, values[0])], (field, values[0])))
+            else:
+                combined = 0
+                for value in values:
+                    combined |= self.bitmaps[(field, value)]
+                conditions.append((combined, None))
+        return conditions
+
+    def _candidates(self, user_id, start, end):
+        """Row numbers in date order for a user and/or date range, or None if unrestricted"""
+        first = encode_date(start) if start else None
+        last = encode_date(end) if end else None
+        if (start and first is None) or (end and last is None):
+            raise ValueError("Dates must be YYYY-MM-DD")
+        if user_id is not None:
+            code = self._user_code(user_id)
+            if code is None or code not in self.user_bounds:
+                return iter(())
+            lo, hi = self.user_bounds[code]
+            rows, days = self.user_rows, self.user_days
+        elif first or last:
+            lo, hi = 0, len(self.date_rows)
+            rows, days = self.date_rows, self.date_days
+        else:
+            return None
+        if first:
+            lo = bisect_left(days, first, lo, hi)
+        if last:
+            hi = bisect_right(days, last, lo, hi)
+        return (rows[i] for i in range(lo, hi))
+
+    def query(self, user_id=None, start=None, end=None, symptoms=(), sleep_quality=None,
+              energy_level=None, mood=None, time_of_day=None, limit=None):
+        """Row numbers matching every condition.
+
+        start/end are inclusive 'YYYY-MM-DD' dates; enum filters take a value
+        or a list of values. Rows come in date order when a user or date
+        range is given, otherwise in row order.
+        """
+        filters = {'sleep_quality': sleep_quality, 'energy_level': energy_level, 'mood': mood,
+                   'time_of_day': time_of_day}
+        conditions = self._conditions(symptoms, filters)
+        candidates = self._candidates(user_id, start, end)
+        if candidates is None:
+            combined = self.all_rows
+            for bitmap, _ in conditions:
+                combined &= bitmap
+            return list(islice(iter_set_bits(combined), limit))
+
+        probes = []
+        for bitmap, key in conditions:
+            if key is None:
+                probes.append(bitmap.to_bytes(len(self.batch) // 8 + 1, 'little'))
+            else:
+                probes.append(self._probe(key))
+        matches = (row for row in candidates
+                   if all(probe[row >> 3] >> (row & 7) & 1 for probe in probes))
+        return list(islice(matches, limit))
+
+    def entries(self, rows):
+        """Entry dicts for row numbers returned by query()"""
+        return [self.batch[row] for row in rows]
+
+def load_index(path):
+    """JournalIndex over a .jcol, .csv, .json or .jsonl journal export"""
+    if path.endswith('.jcol'):
+        return JournalIndex(MappedJournal(path))
+    entries, default_user = iter_source_entries(path)
+    return JournalIndex.from_entries(entries, default_user)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Query journal entries through secondary indexes")
+    parser.add_argument('--file', default='mock_journal_data.json',
+                        help="journal export (.json, .jsonl, .csv or .jcol)")
+    parser.add_argument('--user', help="user_id (or the export's user_email)")
+    parser.add_argument('--from', dest='start', help="first date, YYYY-MM-DD")
+    parser.add_argument('--to', dest='end', help="last date, YYYY-MM-DD")
+    parser.add_argument('--symptom', action='append', default=[], choices=SYMPTOM_COLUMNS)
+    parser.add_argument('--sleep', action='append', help="sleep_quality value (repeat to OR)")
+    parser.add_argument('--energy', action='append', help="energy_level value (repeat to OR)")
+    parser.add_argument('--mood', action='append', help="mood value (repeat to OR)")
+    parser.add_argument('--time-of-day', choices=ENUM_VALUES['time_of_day'])
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = load_index(args.file)
+    built = time.perf_counter()
+    try:
+        rows = index.query(args.user, args.start, args.end, args.symptom, sleep_quality=args.sleep,
+                           energy_level=args.energy, mood=args.mood, time_of_day=args.time_of_day,
+                           limit=args.limit)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    queried = time.perf_counter()
+    print(f"🔎 {len(rows)} matching entries (index built in {built - started:.2f}s, "
+          f"query took {(queried - built) * 1000:.2f} ms)")
+    for entry in index.entries(rows):
+        symptoms = [column for column in SYMPTOM_COLUMNS if entry.get(column)]
+        print(f"   {entry.get('date')} {entry.get('time_of_day')} | sleep {entry.get('sleep_quality')} | "
+              f"mood {entry.get('mood')} | {', '.join(symptoms) or 'no symptoms'}")
+
+if __name__ == "__main__":
+    main()
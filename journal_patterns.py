@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Symptom co-occurrence and lagged sleep patterns in journal entries.
+Replaces the hand-written `interesting_patterns` with rules mined from the
+data: which symptoms show up together, which go with a sleep quality in the
+same entry, and which evening symptoms precede a given sleep quality the next
+morning. Each rule carries its support, confidence and lift.
+
+Every symptom flag and sleep-quality value becomes a packed bitset: a Python
+int with bit r set when row r has it, built from the JournalBatch byte columns
+with bytes.translate() and strided slices. Counting a pair is then one
+`(a & b).bit_count()`, which runs in C over 64-bit words.
+
+Usage:
+    python journal_patterns.py --file mock_journal_data.json
+    python journal_patterns.py --file entries.jsonl --min-support 0.02 --min-confidence 0.5
+"""
+
+import argparse
+import os
+import sys
+from array import array
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from journal_entries import SLEEP_QUALITIES, SYMPTOM_COLUMNS, TIMES_OF_DAY, iter_batches
+from journal_stream import iter_export_entries
+
+DEFAULT_MIN_SUPPORT = 0.05
+DEFAULT_MIN_CONFIDENCE = 0.6
+DEFAULT_MIN_LIFT = 1.2
+MORNING = TIMES_OF_DAY.index('morning') + 1
+EVENING = TIMES_OF_DAY.index('evening') + 1
+
+# _SHIFT_TABLES[k] maps a 0/1 byte to 0/(1 << k)
+_SHIFT_TABLES = [bytes((value << k) & 0xFF for value in range(256)) for k in range(8)]
+# _BIT_TABLES[k] maps a byte to 1 if its bit k is set, else 0
+_BIT_TABLES = [bytes((value >> k) & 1 for value in range(256)) for k in range(8)]
+
+def pack_bits(flags):
+    """Bitset int from a bytes object of 0/1 flags, one per row (bit r = row r)"""
+    flags = flags + bytes(-len(flags) % 8)
+    packed = 0
+    for k in range(8):
+        packed |= int.from_bytes(flags[k::8].translate(_SHIFT_TABLES[k]), 'little')
+    return packed
+
+def symptom_bitsets(symptoms):
+    """One bitset per SYMPTOM_COLUMNS bit of an array('H') column of symptom masks"""
+    data = symptoms.tobytes()
+    stride = symptoms.itemsize
+    bitsets = []
+    for bit in range(len(SYMPTOM_COLUMNS)):
+        byte_index = bit // 8 if sys.byteorder == 'little' else stride - 1 - bit // 8
+        bitsets.append(pack_bits(data[byte_index::stride].translate(_BIT_TABLES[bit % 8])))
+    return bitsets
+
+def code_bitsets(column, vocabulary):
+    """One bitset per code 1..len(vocabulary) of a one-byte array column"""
+    data = column.tobytes()
+    bitsets = []
+    for code in range(1, len(vocabulary) + 1):
+        table = bytes(int(value == code) for value in range(256))
+        bitsets.append(pack_bits(data.translate(table)))
+    return bitsets
+
+class PatternEngine:
+    """Co-occurrence and next-morning sleep counts accumulated over JournalBatch objects"""
+
+    def __init__(self):
+        symptoms, sleeps = len(SYMPTOM_COLUMNS), len(SLEEP_QUALITIES)
+        self.entries = 0
+        self.symptom_counts = [0] * symptoms
+        self.cooccurrence = [[0] * symptoms for _ in range(symptoms)]
+        self.sleep_counts = [0] * sleeps
+        self.symptom_sleep = [[0] * sleeps for _ in range(symptoms)]
+        # Evening entry -> next morning, over (user, day) pairs that have both
+        self.lag_pairs = 0
+        self.lag_symptom_counts = [0] * symptoms
+        self.lag_sleep_counts = [0] * sleeps
+        self.lag_symptom_sleep = [[0] * sleeps for _ in range(symptoms)]
+        # Unmatched halves of evening/morning pairs, carried into later batches
+        self.pending_evenings = {}
+        self.pending_mornings = {}
+
+    def _count(self, symptom_sets, sleep_sets):
+        """Popcounts for rows described by per-symptom and per-sleep-value bitsets"""
+        symptom_counts = [s.bit_count() for s in symptom_sets]
+        sleep_counts = [q.bit_count() for q in sleep_sets]
+        joint = [[(s & q).bit_count() for q in sleep_sets] for s in symptom_sets]
+        return symptom_counts, sleep_counts, joint
+
+    def update(self, batch):
+        """Add a journal_entries.JournalBatch"""
+        if not len(batch):
+            return self
+        self.entries += len(batch)
+        symptom_sets = symptom_bitsets(batch.symptoms)
+        sleep_sets = code_bitsets(batch.sleep_quality, SLEEP_QUALITIES)
+        symptom_counts, sleep_counts, joint = self._count(symptom_sets, sleep_sets)
+        for i, a in enumerate(symptom_sets):
+            self.symptom_counts[i] += symptom_counts[i]
+            for j in range(i, len(symptom_sets)):
+                count = (a & symptom_sets[j]).bit_count()
+                self.cooccurrence[i][j] += count
+                if j != i:
+                    self.cooccurrence[j][i] += count
+            for q in range(len(sleep_sets)):
+                self.symptom_sleep[i][q] += joint[i][q]
+        for q, count in enumerate(sleep_counts):
+            self.sleep_counts[q] += count
+        self._update_lagged(batch)
+        return self
+
+    def _update_lagged(self, batch):
+        """Pair each evening with the same user's next morning and count the pairs"""
+        evenings, mornings = self.pending_evenings, self.pending_mornings
+        paired_symptoms = array('H')
+        paired_sleep = array('B')
+        user_ids, users, days = batch.user_ids, batch.user, batch.day
+        time_of_day, symptoms, sleep = batch.time_of_day, batch.symptoms, batch.sleep_quality
+        for row in range(len(batch)):
+            if not days[row]:
+                continue
+            user = user_ids[users[row] - 1] if users[row] else None
+            if time_of_day[row] == EVENING:
+                key = (user, days[row] + 1)
+                morning_sleep = mornings.pop(key, None)
+                if morning_sleep is None:
+                    evenings[key] = symptoms[row]
+                    continue
+                evening_symptoms = symptoms[row]
+            elif time_of_day[row] == MORNING:
+                key = (user, days[row])
+                evening_symptoms = evenings.pop(key, None)
+                if evening_symptoms is None:
+                    mornings[key] = sleep[row]
+                    continue
+                morning_sleep = sleep[row]
+            else:
+                continue
+            paired_symptoms.append(evening_symptoms)
+            paired_sleep.append(morning_sleep)
+        if not paired_sleep:
+            return
+
+        symptom_counts, sleep_counts, joint = self._count(
+            symptom_bitsets(paired_symptoms), code_bitsets(paired_sleep, SLEEP_QUALITIES))
+        self.lag_pairs += len(paired_sleep)
+        for i, count in enumerate(symptom_counts):
+            self.lag_symptom_counts[i] += count
+            for q in range(len(SLEEP_QUALITIES)):
+                self.lag_symptom_sleep[i][q] += joint[i][q]
+        for q, count in enumerate(sleep_counts):
+            self.lag_sleep_counts[q] += count
+
+    def matrix(self):
+        """Symptom co-occurrence counts as {symptom: {symptom: entries}}"""
+        return {a: dict(zip(SYMPTOM_COLUMNS, row)) for a, row in zip(SYMPTOM_COLUMNS, self.cooccurrence)}
+
+    def patterns(self, min_support=DEFAULT_MIN_SUPPORT, min_confidence=DEFAULT_MIN_CONFIDENCE,
+                 min_lift=DEFAULT_MIN_LIFT):
+        """Association rules passing the thresholds, strongest first.
+
+        Each is a dict with kind ('together', 'sleep' or 'next_morning'),
+        antecedent, consequent, count, support, confidence and lift.
+        """
+        rules = []
+
+        def consider(kind, antecedent, consequent, both, antecedent_count, consequent_count, total):
+            if not total or not antecedent_count or not consequent_count:
+                return
+            support = both / total
+            confidence = both / antecedent_count
+            lift = confidence / (consequent_count / total)
+            if support >= min_support and confidence >= min_confidence and lift >= min_lift:
+                rules.append({'kind': kind, 'antecedent': antecedent, 'consequent': consequent,
+                              'count': both, 'support': support, 'confidence': confidence,
+                              'lift': lift})
+
+        for i, a in enumerate(SYMPTOM_COLUMNS):
+            for j, b in enumerate(SYMPTOM_COLUMNS):
+                if i != j:
+                    consider('together', a, b, self.cooccurrence[i][j], self.symptom_counts[i],
+                             self.symptom_counts[j], self.entries)
+            for q, quality in enumerate(SLEEP_QUALITIES):
+                consider('sleep', a, quality, self.symptom_sleep[i][q], self.symptom_counts[i],
+                         self.sleep_counts[q], self.entries)
+                consider('next_morning', a, quality, self.lag_symptom_sleep[i][q],
+                         self.lag_symptom_counts[i], self.lag_sleep_counts[q], self.lag_pairs)
+        rules.sort(key=lambda rule: (rule['confidence'], rule['support']), reverse=True)
+        return rules
+
+def describe(rule):
+    """One-line description of a pattern, in the style of `interesting_patterns`"""
+    antecedent = rule['antecedent'].replace('_', ' ')
+    consequent = rule['consequent'].replace('_', ' ')
+    # Labels may be singular ("pain") or plural ("hot flashes"), so keep them
+    # out of subject position
+    if rule['kind'] == 'together':
+        text = f"Entries with {antecedent} usually also have {consequent}"
+    elif rule['kind'] == 'sleep':
+        text = f"Entries with {antecedent} usually have {consequent} sleep"
+    else:
+        text = f"After {antecedent} in the evening, sleep the next morning is usually {consequent}"
+    return (f"{text} (support {rule['support']:.0%}, confidence {rule['confidence']:.0%}, "
+            f"lift {rule['lift']:.1f})")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Mine symptom co-occurrence and sleep patterns")
+    parser.add_argument('--file', default='mock_journal_data.json',
+                        help="journal export (.json like mock_journal_data.json, or .jsonl)")
+    parser.add_argument('--min-support', type=float, default=DEFAULT_MIN_SUPPORT)
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument('--min-lift', type=float, default=DEFAULT_MIN_LIFT)
+    parser.add_argument('--limit', type=int, default=20, help="patterns to print")
+    args = parser.parse_args()
+
+    entries, _ = iter_export_entries(args.file)
+    engine = PatternEngine()
+    for batch in iter_batches(entries):
+        engine.update(batch)
+    print(f"📊 {engine.entries} entries, {engine.lag_pairs} evening/next-morning pairs")
+    print()
+
+    print("🔥 Symptom Co-occurrence (entries with both):")
+    width = max(len(column) for column in SYMPTOM_COLUMNS)
+    print(" " * (width + 3) + " ".join(f"{i:>6}" for i in range(len(SYMPTOM_COLUMNS))))
+    for i, (column, row) in enumerate(zip(SYMPTOM_COLUMNS, engine.cooccurrence)):
+        print(f"   {column:<{width}} " + " ".join(f"{count:>6}" for count in row) + f"   [{i}]")
+    print()
+
+    patterns = engine.patterns(args.min_support, args.min_confidence, args.min_lift)
+    print(f"🎯 Detected Patterns ({len(patterns)}):")
+    for rule in patterns[:args.limit]:
+        print(f"   • {describe(rule)}")
+
+if __name__ == "__main__":
+    main()
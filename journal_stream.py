@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for journal exports shaped like mock_journal_data.json:
+a top-level object with metadata keys and an `entries` array.
+
+JournalStream never holds the whole export in memory. Iterating its entries
+parses one array element at a time from a buffered file, and the metadata
+keys are read on demand: keys that come before `entries` are read without
+touching the array, keys after it by skipping over the array element by
+element.
+
+Usage:
+    stream = JournalStream('export.json')
+    print(stream.get('user_email'))
+    for entry in stream.entries():
+        ...
+"""
+
+import json
+import os
+
+READ_CHUNK_CHARS = 1 << 16
+WHITESPACE = ' \t\n\r'
+_MISSING = object()
+# A decode error further than this from the end of the buffer is not a value
+# cut off by the chunk boundary (the longest partial token is '-Infinity'),
+# so reading more input cannot fix it
+DECODE_LOOKAHEAD_CHARS = 16
+
+class _JsonReader:
+    """Pulls JSON tokens and values out of a text file through a sliding buffer"""
+
+    def __init__(self, f, chunk_chars=READ_CHUNK_CHARS):
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read another chunk; returns False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                truncated = (e.pos >= len(self.buffer) - DECODE_LOOKAHEAD_CHARS
+                             or e.msg.startswith('Unterminated string'))
+                if not truncated or not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array_items(self):
+        """Yield the elements of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+class JournalStream:
+    """Lazily-read journal export; behaves like a read-only dict of its top-level keys"""
+
+    def __init__(self, path, chunk_chars=READ_CHUNK_CHARS):
+        os.stat(path)  # fail early, like open(), if the export is missing
+        self.path = path
+        self.chunk_chars = chunk_chars
+        self.metadata = {}
+        self.header_read = False
+        self.fully_read = False
+        self.has_entries = False
+
+    def _scan(self, mode):
+        """Walk the top-level object, recording metadata as it goes.
+
+        mode 'header' stops at the entries array, 'metadata' skips over it and
+        'entries' yields its elements.
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            reader = _JsonReader(f, self.chunk_chars)
+            reader.expect('{')
+            if reader.peek() == '}':
+                self.header_read = self.fully_read = True
+                return
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                if key == 'entries':
+                    self.header_read = self.has_entries = True
+                    if mode == 'header':
+                        return
+                    for entry in reader.array_items():
+                        if mode == 'entries':
+                            yield entry
+                else:
+                    self.metadata[key] = reader.value()
+                if reader.expect(',}') == '}':
+                    self.header_read = self.fully_read = True
+                    return
+
+    def entries(self):
+        """Yield the entries one at a time (a fresh pass over the file each call)"""
+        return self._scan('entries')
+
+    def __iter__(self):
+        return self.entries()
+
+    def get(self, key, default=None):
+        if key == 'entries':
+            return self.entries()
+        if key not in self.metadata and not self.header_read:
+            for _ in self._scan('header'):
+                pass
+        if key not in self.metadata and not self.fully_read:
+            for _ in self._scan('metadata'):
+                pass
+        return self.metadata.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        if key == 'entries':
+            if not self.header_read:
+                for _ in self._scan('header'):
+                    pass
+            return self.has_entries
+        return self.get(key, _MISSING) is not _MISSING
+
+def iter_export_entries(path):
+    """(entries iterator, export-level user) for a .json export or a .jsonl file of entries.
+
+    The export-level user is the export's `user_email`, for entries that don't
+    carry a user_id of their own.
+    """
+    if path.endswith('.jsonl'):
+        def lines():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return lines(), None
+    stream = JournalStream(path)
+    return stream.entries(), stream.get('user_email')
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Summary statistics computed from journal entries.
+Builds the same distributions as the hand-written `summary` block of
+mock_journal_data.json (sleep quality, mood, energy, symptom frequency) from
+a journal_entries.JournalBatch.
+
+Counting is done column-at-a-time on the batch's byte arrays: bytes.count()
+per enum code, and bytes.translate() + count() per symptom bit, so the work
+runs in C rather than once per entry in Python. Summaries can be updated batch
+by batch, so a stream of entries never has to be held in memory at once.
+"""
+
+import sys
+
+from journal_entries import (DEFAULT_BATCH_SIZE, ENERGY_LEVELS, MOODS, SLEEP_QUALITIES,
+                             SYMPTOM_COLUMNS, JournalBatch, decode_date, iter_batches)
+
+# summary block key -> (entry field, vocabulary)
+DISTRIBUTIONS = {
+    'sleep_quality_distribution': ('sleep_quality', SLEEP_QUALITIES),
+    'mood_distribution': ('mood', MOODS),
+    'energy_levels': ('energy_level', ENERGY_LEVELS),
+}
+
+# translate() tables mapping a byte to 1 if the given bit is set, else 0
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+def count_codes(column, vocabulary):
+    """Count each code 1..len(vocabulary) in a one-byte array column"""
+    data = column.tobytes()
+    return [data.count(code) for code in range(1, len(vocabulary) + 1)]
+
+def count_bits(column, width):
+    """Count how often each of the low `width` bits is set in an unsigned array column"""
+    data = column.tobytes()
+    stride = column.itemsize
+    counts = []
+    for bit in range(width):
+        byte_index = bit // 8 if sys.byteorder == 'little' else stride - 1 - bit // 8
+        plane = data[byte_index::stride]
+        counts.append(plane.translate(_BIT_TABLES[bit % 8]).count(1))
+    return counts
+
+class JournalSummary:
+    """Running totals over one or more JournalBatch objects"""
+
+    def __init__(self):
+        self.total_entries = 0
+        self.counts = {key: [0] * len(values) for key, (_, values) in DISTRIBUTIONS.items()}
+        self.other_values = {key: {} for key in DISTRIBUTIONS}
+        self.symptoms = [0] * len(SYMPTOM_COLUMNS)
+        self.first_day = None
+        self.last_day = None
+
+    @classmethod
+    def from_entries(cls, entries, batch_size=DEFAULT_BATCH_SIZE):
+        """Summarize any iterable of entry dicts, packing `batch_size` at a time"""
+        summary = cls()
+        for batch in iter_batches(entries, batch_size):
+            summary.update(batch)
+        return summary
+
+    def update(self, batch):
+        """Add a JournalBatch's entries to the totals"""
+        if not len(batch):
+            return self
+        self.total_entries += len(batch)
+        for key, (field, values) in DISTRIBUTIONS.items():
+            for i, count in enumerate(count_codes(getattr(batch, field), values)):
+                self.counts[key][i] += count
+        for i, count in enumerate(count_bits(batch.symptoms, len(SYMPTOM_COLUMNS))):
+            self.symptoms[i] += count
+        # Values outside the known vocabularies are kept verbatim in the overflow
+        for overflow in batch.overflow.values():
+            for key, (field, _) in DISTRIBUTIONS.items():
+                value = overflow.get(field)
+                if value is not None:
+                    self.other_values[key][value] = self.other_values[key].get(value, 0) + 1
+        # 0 marks a missing or overflowed date
+        first, last = min(batch.day), max(batch.day)
+        if not first:
+            first = min((day for day in batch.day if day), default=0)
+        if first:
+            self.first_day = first if self.first_day is None else min(self.first_day, first)
+            self.last_day = last if self.last_day is None else max(self.last_day, last)
+        return self
+
+    def as_dict(self):
+        """Summary in the shape of mock_journal_data.json's `summary` block"""
+        summary = {'total_entries': self.total_entries}
+        if self.first_day is not None:
+            summary['date_range'] = f"{self.last_day - self.first_day + 1} days"
+            summary['first_date'] = decode_date(self.first_day)
+            summary['last_date'] = decode_date(self.last_day)
+        for key, (_, values) in DISTRIBUTIONS.items():
+            distribution = {value: count for value, count in zip(values, self.counts[key]) if count}
+            distribution.update(self.other_values[key])
+            summary[key] = distribution
+        summary['symptoms_frequency'] = {
+            column: count for column, count in zip(SYMPTOM_COLUMNS, self.symptoms) if count
+        }
+        return summary
+
+def summarize(entries):
+    """Summary dict for an iterable of entry dicts or a JournalBatch"""
+    if isinstance(entries, JournalBatch):
+        return JournalSummary().update(entries).as_dict()
+    return JournalSummary.from_entries(entries).as_dict()
+
+def stale_sections(stored, computed):
+    """Names of the stored summary sections that disagree with the computed ones"""
+    if not stored:
+        return ['summary']
+    stale = []
+    if stored.get('total_entries', computed['total_entries']) != computed['total_entries']:
+        stale.append('total_entries')
+    for key in DISTRIBUTIONS:
+        if {k: v for k, v in stored.get(key, {}).items() if v} != computed[key]:
+            stale.append(key)
+    # The stored block tracks a subset of SYMPTOM_COLUMNS; compare only those
+    stored_symptoms = stored.get('symptoms_frequency', {})
+    if any(computed['symptoms_frequency'].get(k, 0) != v for k, v in stored_symptoms.items()):
+        stale.append('symptoms_frequency')
+    return stale
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Rolling-window journal trends per user.
+Keeps 7- and 30-day symptom rates and sleep-quality moving averages for every
+user, updated entry by entry, and saves its state so the next run only has to
+read the rows created since.
+
+Each window is a ring of per-day slots plus running totals: adding an entry
+touches one slot, and when a user's latest day moves forward the slots that
+fall out of the window are subtracted from the totals. That is O(1) per entry
+(amortized; a jump of more than a window just clears the ring).
+
+Sleep is scored with the journal_entries code: poor=1, fair=2, good=3,
+excellent=4.
+
+Usage:
+    python journal_trends.py --file mock_journal_data.json --state trends_state.json
+    python generate_journal_data.py --users 100 --days 90 -o entries.jsonl
+    python journal_trends.py --file entries.jsonl --state trends_state.json --user <user_id>
+"""
+
+import argparse
+import json
+import os
+import sys
+from array import array
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from journal_entries import (MISSING_TIMESTAMP, SYMPTOM_COLUMNS, TIMES_OF_DAY, decode_date,
+                             encode_timestamp, pack_entry)
+from journal_stream import iter_export_entries
+
+DEFAULT_WINDOWS = (7, 30)
+STATE_VERSION = 3
+_SYMPTOMS = len(SYMPTOM_COLUMNS)
+
+class RollingWindow:
+    """Aggregates over the last `days` days ending at the newest day seen"""
+
+    __slots__ = ('days', 'latest', 'slot_days', 'slot_counts', 'slot_symptoms', 'slot_sleep',
+                 'slot_sleep_counts', 'count', 'symptoms', 'sleep_sum', 'sleep_count')
+
+    def __init__(self, days):
+        self.days = days
+        self.latest = None
+        self.slot_days = array('i', [0] * days)      # day held by each slot, 0 = empty
+        self.slot_counts = array('I', [0] * days)
+        self.slot_symptoms = array('I', [0] * (days * _SYMPTOMS))
+        self.slot_sleep = array('I', [0] * days)
+        self.slot_sleep_counts = array('I', [0] * days)
+        self.count = 0
+        self.symptoms = [0] * _SYMPTOMS
+        self.sleep_sum = 0
+        self.sleep_count = 0
+
+    def _expire(self, day):
+        slot = day % self.days
+        if self.slot_days[slot] != day:
+            return
+        self.count -= self.slot_counts[slot]
+        self.sleep_sum -= self.slot_sleep[slot]
+        self.sleep_count -= self.slot_sleep_counts[slot]
+        base = slot * _SYMPTOMS
+        for i in range(_SYMPTOMS):
+            self.symptoms[i] -= self.slot_symptoms[base + i]
+            self.slot_symptoms[base + i] = 0
+        self.slot_days[slot] = self.slot_counts[slot] = 0
+        self.slot_sleep[slot] = self.slot_sleep_counts[slot] = 0
+
+    def _advance(self, day):
+        """Move the window's end to `day`, dropping days that fall out of it"""
+        if self.latest is not None:
+            # Days still held are latest-days+1 .. latest; drop those before day-days+1
+            for old_day in range(self.latest - self.days + 1, min(self.latest + 1, day - self.days + 1)):
+                self._expire(old_day)
+        self.latest = day
+
+    def add(self, day, symptoms, sleep):
+        """Add one entry (day ordinal, symptom mask, sleep code or 0); False if it's too old"""
+        if self.latest is None or day > self.latest:
+            self._advance(day)
+        elif day <= self.latest - self.days:
+            return False
+        slot = day % self.days
+        self.slot_days[slot] = day
+        self.slot_counts[slot] += 1
+        self.count += 1
+        if sleep:
+            self.slot_sleep[slot] += sleep
+            self.slot_sleep_counts[slot] += 1
+            self.sleep_sum += sleep
+            self.sleep_count += 1
+        base = slot * _SYMPTOMS
+        while symptoms:
+            i = (symptoms & -symptoms).bit_length() - 1
+            self.slot_symptoms[base + i] += 1
+            self.symptoms[i] += 1
+            symptoms &= symptoms - 1
+        return True
+
+    def rates(self):
+        """Share of the window's entries reporting each symptom"""
+        return {column: (count / self.count if self.count else 0.0)
+                for column, count in zip(SYMPTOM_COLUMNS, self.symptoms)}
+
+    def sleep_average(self):
+        return self.sleep_sum / self.sleep_count if self.sleep_count else None
+
+    def snapshot(self):
+        """Non-empty slots as [day, entries, sleep_sum, sleep_entries, *symptom_counts]"""
+        slots = []
+        for slot, day in enumerate(self.slot_days):
+            if day:
+                base = slot * _SYMPTOMS
+                slots.append([day, self.slot_counts[slot], self.slot_sleep[slot],
+                              self.slot_sleep_counts[slot], *self.slot_symptoms[base:base + _SYMPTOMS]])
+        return {'latest': self.latest, 'slots': slots}
+
+    @classmethod
+    def restore(cls, days, state):
+        window = cls(days)
+        window.latest = state['latest']
+        for day, count, sleep_sum, sleep_count, *symptoms in state['slots']:
+            slot = day % days
+            window.slot_days[slot] = day
+            window.slot_counts[slot] = count
+            window.slot_sleep[slot] = sleep_sum
+            window.slot_sleep_counts[slot] = sleep_count
+            window.count += count
+            window.sleep_sum += sleep_sum
+            window.sleep_count += sleep_count
+            for i, value in enumerate(symptoms):
+                window.slot_symptoms[slot * _SYMPTOMS + i] = value
+                window.symptoms[i] += value
+        return window
+
+class TrendTracker:
+    """Rolling windows for every user, plus a created_at high-water mark for incremental runs"""
+
+    def __init__(self, windows=DEFAULT_WINDOWS):
+        self.windows = tuple(windows)
+        self.users = {}
+        self.high_water = None
+        self.boundary = set()       # (user_id, date, time_of_day) of the rows created at high_water
+        self.since = None           # high_water as of the last load; older rows are skipped
+        self.since_boundary = set()
+        self.entries_added = 0
+        self.late_entries = 0
+
+    def _user_windows(self, user_id):
+        windows = self.users.get(user_id)
+        if windows is None:
+            windows = self.users[user_id] = [RollingWindow(days) for days in self.windows]
+        return windows
+
+    def add_packed(self, user_id, day, symptoms, sleep, created_at=MISSING_TIMESTAMP, time_of_day=0):
+        """Add one entry given its packed fields (see journal_entries.pack_entry)"""
+        if not day:
+            return
+        late = False
+        for window in self._user_windows(user_id):
+            late |= not window.add(day, symptoms, sleep)
+        self.late_entries += late
+        self.entries_added += 1
+        if created_at == MISSING_TIMESTAMP:
+            return
+        if self.high_water is None or created_at > self.high_water:
+            self.high_water = created_at
+            self.boundary = set()
+        if created_at == self.high_water:
+            self.boundary.add((user_id, decode_date(day),
+                               TIMES_OF_DAY[time_of_day - 1] if time_of_day else None))
+
+    def add(self, entry, default_user=None):
+        packed = pack_entry(entry)
+        self.add_packed(packed[2] or default_user, packed[3], packed[8], packed[5], packed[10], packed[4])
+
+    def add_batch(self, batch, default_user=None):
+        """Add every row of a journal_entries.JournalBatch"""
+        user_ids = batch.user_ids
+        for row in range(len(batch)):
+            user = batch.user[row]
+            self.add_packed(user_ids[user - 1] if user else default_user, batch.day[row],
+                            batch.symptoms[row], batch.sleep_quality[row], batch.created_at[row],
+                            batch.time_of_day[row])
+
+    def is_new(self, entry, default_user=None):
+        """True if the entry was not added by the previous run.
+
+        Rows created at the previous high-water mark are new unless their
+        (user_id, date, time_of_day) was already added; a created_at that
+        cannot be parsed is never new, since there is no telling when it was
+        written.
+        """
+        if self.since is None:
+            return True
+        created_at = encode_timestamp(entry.get('created_at'))
+        if created_at is None:
+            return False
+        if created_at[0] != self.since:
+            return created_at[0] > self.since
+        key = (entry.get('user_id') or default_user, entry.get('date'), entry.get('time_of_day'))
+        return key not in self.since_boundary
+
+    def trends(self, user_id):
+        """{window_days: {'as_of', 'entries', 'symptom_rates', 'sleep_average'}} for a user"""
+        result = {}
+        for window in self.users.get(user_id, ()):
+            result[window.days] = {
+                'as_of': decode_date(window.latest),
+                'entries': window.count,
+                'symptom_rates': window.rates(),
+                'sleep_average': window.sleep_average(),
+            }
+        return result
+
+    def save(self, path):
+        """Write the tracker state atomically"""
+        state = {
+            'version': STATE_VERSION,
+            'windows': list(self.windows),
+            'high_water': self.high_water,
+            'boundary': sorted(self.boundary, key=repr),
+            'users': {user_id: [window.snapshot() for window in windows]
+                      for user_id, windows in self.users.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported trends state version: {state.get('version')}")
+        tracker = cls(state['windows'])
+        tracker.high_water = tracker.since = state['high_water']
+        tracker.boundary = {tuple(key) for key in state['boundary']}
+        tracker.since_boundary = set(tracker.boundary)
+        for user_id, windows in state['users'].items():
+            tracker.users[user_id] = [RollingWindow.restore(days, window)
+                                      for days, window in zip(tracker.windows, windows)]
+        return tracker
+
+def print_trends(tracker, user_id):
+    if user_id not in tracker.users:
+        print(f"⚠️ No entries for {user_id}")
+        return
+    print(f"📈 Trends for {user_id}:")
+    for days, trend in tracker.trends(user_id).items():
+        sleep = trend['sleep_average']
+        sleep_text = f"sleep average {sleep:.2f}" if sleep is not None else "no sleep data"
+        print(f"   Last {days} days (to {trend['as_of']}): {trend['entries']} entries, {sleep_text}")
+        for symptom, rate in trend['symptom_rates'].items():
+            if rate:
+                print(f"      {symptom}: {rate:.0%}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Rolling-window symptom and sleep trends per user")
+    parser.add_argument('--file', default='mock_journal_data.json',
+                        help="journal export (.json like mock_journal_data.json, or .jsonl)")
+    parser.add_argument('--state', help="load state from and save it to this file")
+    parser.add_argument('--window', type=int, action='append',
+                        help=f"window length in days (repeatable, default {DEFAULT_WINDOWS})")
+    parser.add_argument('--user', action='append', default=[], help="user to print (repeatable)")
+    args = parser.parse_args()
+
+    if args.state and os.path.exists(args.state):
+        tracker = TrendTracker.load(args.state)
+        if args.window and tuple(args.window) != tracker.windows:
+            print(f"Error: {args.state} was built with windows {tracker.windows}")
+            sys.exit(1)
+        print(f"🔁 Resuming from {args.state} ({len(tracker.users)} users)")
+    else:
+        tracker = TrendTracker(args.window or DEFAULT_WINDOWS)
+
+    entries, default_user = iter_export_entries(args.file)
+    skipped = 0
+    for entry in entries:
+        if tracker.is_new(entry, default_user):
+            tracker.add(entry, default_user)
+        else:
+            skipped += 1
+    print(f"✅ Added {tracker.entries_added} new entries ({skipped} already processed, "
+          f"{tracker.late_entries} older than a window)")
+
+    if args.state:
+        tracker.save(args.state)
+        print(f"💾 Saved state to {args.state}")
+    for user_id in args.user or list(tracker.users)[:3]:
+        print_trends(tracker, user_id)
+
+if __name__ == "__main__":
+    main()
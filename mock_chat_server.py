@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Next.js /api/chat route.
+Accepts the same {message, userId, conversationId} payload and answers in
+the route's JSON shape, so test_chat_api.py, chat_load_test.py and
+chat_stream_client.py can be benchmarked without OpenAI, Supabase or a
+network.
+
+- latency: a distribution for the time to the reply (to the first token
+  when streaming; streamed headers go out at once),
+  e.g. fixed:300, uniform:200:800, normal:400:80, lognormal:350:0.4
+  (median, sigma) or exponential:300 (mean), all in milliseconds, plus an
+  optional delay per earlier message in the conversation
+- replies: json (like the route today), sse (one `data: {"token"}` event
+  per word, then the metadata and [DONE]) or chunked plain text, with a
+  configurable gap between tokens
+- errors: --error STATUS:RATE injects error answers (with the route's
+  fallback body), --disconnect-rate closes the connection without answering
+- record/replay: --record FILE --upstream URL proxies to a real server and
+  appends every exchange to a JSONL file; --replay FILE serves those
+  responses back, matched by message text (else in order), with their
+  recorded latency
+
+Usage:
+    python mock_chat_server.py --port 3000 --latency lognormal:400:0.5 --reply sse --token-gap-ms 30
+    python mock_chat_server.py --port 3001 --record chat_capture.jsonl --upstream http://localhost:3000/api/chat
+    python mock_chat_server.py --port 3000 --replay chat_capture.jsonl
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_client import ChatClient, ConnectionPool
+
+REPLY_MODES = ("json", "sse", "chunked")
+FALLBACK_RESPONSE = "מצטערת, יש בעיה טכנית כרגע. אנא נסי שוב מאוחר יותר."
+REPLY_SENTENCES = [
+    "אני שומעת אותך, וזה לגמרי טבעי להרגיש ככה בתקופה הזאת.",
+    "גלי חום בלילה הם אחד הדברים הכי מתישים, ואת לא לבד בזה.",
+    "כדאי לנסות לשים לב מה קדם לגל החום, לפעמים יש דפוס.",
+    "שינה טובה מתחילה הרבה לפני שנכנסים למיטה.",
+    "מה עוזר לך בדרך כלל להירגע בערב?",
+    "אפשר לדבר על זה גם עם הרופאה, ולהביא איתך את היומן.",
+    "תזכרי שמגיע לך לנוח, גם כשהראש מלא.",
+    "ספרי לי עוד, מה היה הכי קשה השבוע?",
+]
+CREDITS_START = 1000
+
+def parse_latency(spec):
+    """Sampler (random.Random -> milliseconds) for a latency spec like 'normal:400:80'"""
+    name, *params = spec.split(":")
+    try:
+        values = [float(value) for value in params]
+    except ValueError:
+        raise ValueError(f"Bad latency spec: {spec}")
+    shapes = {
+        "fixed": (1, lambda rng, ms: ms),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: median * rng.lognormvariate(0, sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean else 0.0),
+    }
+    if name not in shapes or len(values) != shapes[name][0]:
+        raise ValueError(f"Bad latency spec: {spec} (expected one of "
+                         "fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD, lognormal:MEDIAN:SIGMA, exponential:MEAN)")
+    sample = shapes[name][1]
+    return lambda rng: max(0.0, sample(rng, *values))
+
+def parse_error(spec):
+    """(status, rate) from 'STATUS:RATE'"""
+    try:
+        status, rate = spec.split(":")
+        return int(status), float(rate)
+    except ValueError:
+        raise ValueError(f"Bad error spec: {spec} (expected STATUS:RATE, e.g. 503:0.05)")
+
+def load_recording(path):
+    """Recorded exchanges from a --record JSONL file"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+class MockChatState:
+    """Conversations, reply settings and failure injection shared by all requests"""
+
+    def __init__(self, latency="fixed:0", history_latency_ms=0.0, reply="json", reply_words=40,
+                 token_gap_ms=0.0, errors=(), disconnect_rate=0.0, seed=None,
+                 replay=None, record=None, upstream=None):
+        if reply not in REPLY_MODES:
+            raise ValueError(f"Unknown reply mode: {reply}")
+        self.latency = parse_latency(latency)
+        self.history_latency_ms = history_latency_ms
+        self.reply = reply
+        self.reply_words = reply_words
+        self.token_gap_ms = token_gap_ms
+        self.errors = [parse_error(spec) if isinstance(spec, str) else spec for spec in errors]
+        self.disconnect_rate = disconnect_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.conversations = {}
+        self.credits = defaultdict(lambda: CREDITS_START)
+        self.requests = 0
+        self.outcomes = Counter()
+        self.replay = None
+        if replay:
+            records = load_recording(replay)
+            self.replay = {"order": deque(records), "by_message": defaultdict(deque)}
+            for record in records:
+                self.replay["by_message"][record["request"].get("message")].append(record)
+        self.record = record
+        self.upstream = upstream
+        self.client = ChatClient(ConnectionPool(max_per_host=64)) if upstream else None
+
+    def roll(self):
+        """'disconnect', an injected HTTP status, or None for a normal answer"""
+        with self.lock:
+            draw = self.random.random()
+            if draw < self.disconnect_rate:
+                return "disconnect"
+            draw -= self.disconnect_rate
+            for status, rate in self.errors:
+                if draw < rate:
+                    return status
+                draw -= rate
+            return None
+
+    def count(self, outcome):
+        with self.lock:
+            self.outcomes[outcome] += 1
+
+    def first_byte_delay(self, history):
+        """Seconds before the first byte, for a conversation with `history` earlier messages"""
+        with self.lock:
+            ms = self.latency(self.random)
+        return (ms + self.history_latency_ms * history) / 1000
+
+    def start_turn(self, conversation_id):
+        """(conversation id, earlier messages) for a turn, or (None, None) if the id is unknown.
+
+        A new conversation only exists once its first turn succeeds, like the route.
+        """
+        with self.lock:
+            if conversation_id is None:
+                return str(uuid.UUID(int=self.random.getrandbits(128), version=4)), 0
+            history = self.conversations.get(conversation_id)
+            if history is None:
+                return None, None
+            return conversation_id, len(history)
+
+    def finish_turn(self, conversation_id, user_id, message, reply):
+        with self.lock:
+            self.conversations.setdefault(conversation_id, []).extend([message, reply])
+            self.credits[user_id] -= 1
+            return self.credits[user_id]
+
+    def reply_words_for(self, message):
+        with self.lock:
+            rng = random.Random(f"{message}:{self.random.random()}")
+        words = []
+        while len(words) < self.reply_words:
+            words.extend(rng.choice(REPLY_SENTENCES).split())
+        return words[:self.reply_words]
+
+    def replayed(self, message):
+        """Next recorded exchange for `message`, else the next one in recording order"""
+        with self.lock:
+            queue = self.replay["by_message"].get(message)
+            if not queue:
+                queue = self.replay["order"]
+            if not queue:
+                return None
+            record = queue.popleft()
+            queue.append(record)
+            return record
+
+    def save_exchange(self, exchange):
+        line = json.dumps(exchange, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self.record, "a", encoding="utf-8") as f:
+                f.write(line)
+
+class MockChatHandler(BaseHTTPRequestHandler):
+    """Request handler; the server's `state` attribute holds the data"""
+
+    protocol_version = "HTTP/1.1"
+    # Buffer writes so headers and body leave in one segment, and send streamed
+    # events right away: with Nagle on, each small SSE write after the first
+    # waits for the client's delayed ACK (~40 ms) on a reused connection
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                        "application/json; charset=utf-8")
+
+    def _send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        try:
+            return raw, json.loads(raw or b"null")
+        except ValueError:
+            return raw, None
+
+    def do_POST(self):
+        state = self.server.state
+        if urlparse(self.path).path != "/api/chat":
+            self._send_json(404, {"error": f"no route for {self.path}"})
+            return
+        with state.lock:
+            state.requests += 1
+        raw, body = self._read_json()
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "Invalid JSON body"})
+            return
+        if state.upstream:
+            self._proxy(raw, body)
+            return
+        outcome = state.roll()
+        if outcome == "disconnect":
+            state.count("disconnect")
+            self.close_connection = True
+            return
+        if state.replay is not None:
+            self._replay(body)
+            return
+
+        message, user_id = body.get("message"), body.get("userId")
+        if not message:
+            self._send_json(400, {"error": "Message is required"})
+            return
+        if not user_id:
+            self._send_json(400, {"error": "User ID is required"})
+            return
+        conversation_id, history = state.start_turn(body.get("conversationId"))
+        if conversation_id is None:
+            state.count(404)
+            self._send_json(404, {"error": "Conversation not found"})
+            return
+        delay = state.first_byte_delay(history)
+        if outcome is not None:
+            time.sleep(delay)
+            state.count(outcome)
+            self._send_json(outcome, {
+                "response": FALLBACK_RESPONSE,
+                "conversationId": None,
+                "wallet": "chat",
+                "creditsRemaining": 0,
+                "transparencyMessage": "אירעה שגיאה טכנית.",
+                "error": "Injected failure",
+            })
+            return
+
+        words = state.reply_words_for(message)
+        reply = " ".join(words)
+        credits = state.finish_turn(conversation_id, user_id, message, reply)
+        metadata = {
+            "conversationId": conversation_id,
+            "wallet": "chat",
+            "creditsRemaining": credits,
+            "creditsDeducted": 1,
+            "rawTokens": len(words) + len(message.split()) * (history + 1),
+        }
+        state.count(200)
+        if state.reply == "json":
+            time.sleep(delay)
+            self._send_json(200, {"response": reply, **metadata})
+            return
+        self._stream(words, metadata, delay)
+
+    def _stream(self, words, metadata, delay):
+        """Send headers at once, then the first token after `delay` seconds"""
+        state = self.server.state
+        sse = state.reply == "sse"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "text/plain; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+        time.sleep(delay)
+        for i, word in enumerate(words):
+            if i and state.token_gap_ms:
+                time.sleep(state.token_gap_ms / 1000)
+            token = word if i == 0 else f" {word}"
+            if sse:
+                event = json.dumps({"token": token}, ensure_ascii=False)
+                self._send_chunk(f"data: {event}\n\n".encode("utf-8"))
+            else:
+                self._send_chunk(token.encode("utf-8"))
+        if sse:
+            event = json.dumps(metadata, ensure_ascii=False)
+            self._send_chunk(f"data: {event}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self._send_chunk(b"")
+
+    def _replay(self, body):
+        state = self.server.state
+        record = state.replayed(body.get("message"))
+        if record is None:
+            self._send_json(503, {"error": "Replay file has no recorded responses"})
+            return
+        time.sleep(record.get("elapsed_ms", 0) / 1000)
+        state.count(record["status"])
+        self._send_body(record["status"], record["body"].encode("utf-8"), record["content_type"])
+
+    def _proxy(self, raw, body):
+        state = self.server.state
+        started = time.perf_counter()
+        try:
+            status, headers, data = state.client.request(
+                "POST", state.upstream, body=raw, headers={"Content-Type": "application/json"})
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            # Refused/reset connections, RemoteDisconnected, IncompleteRead, malformed replies
+            state.count("upstream_error")
+            self._send_json(502, {"error": f"Upstream unavailable: {e}"})
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        content_type = headers.get("content-type", "application/json")
+        state.save_exchange({
+            "request": body,
+            "status": status,
+            "content_type": content_type,
+            "body": data.decode("utf-8", errors="replace"),
+            "elapsed_ms": round(elapsed_ms, 3),
+        })
+        state.count(status)
+        self._send_body(status, data, content_type)
+
+    def do_DELETE(self):
+        state = self.server.state
+        _, body = self._read_json()
+        body = body if isinstance(body, dict) else {}
+        if not body.get("conversationId"):
+            self._send_json(400, {"error": "Conversation ID is required"})
+            return
+        if not body.get("userId"):
+            self._send_json(400, {"error": "User ID is required"})
+            return
+        with state.lock:
+            state.conversations.pop(body["conversationId"], None)
+        self._send_json(200, {"success": True})
+
+def start_server(host="127.0.0.1", port=0, **state_options):
+    """Start the stand-in on a background thread and return the server"""
+    server = ThreadingHTTPServer((host, port), MockChatHandler)
+    server.daemon_threads = True
+    server.state = MockChatState(**state_options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the /api/chat route")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="time to first byte in ms: fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD, "
+                             "lognormal:MEDIAN:SIGMA or exponential:MEAN")
+    parser.add_argument("--history-latency-ms", type=float, default=0.0,
+                        help="extra delay per earlier message in the conversation")
+    parser.add_argument("--reply", choices=REPLY_MODES, default="json")
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--token-gap-ms", type=float, default=0.0,
+                        help="delay between streamed tokens")
+    parser.add_argument("--error", action="append", default=[],
+                        help="inject STATUS answers at RATE, e.g. 503:0.05 (repeatable)")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0,
+                        help="fraction of requests whose connection is closed without an answer")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", help="append proxied exchanges to this JSONL file (needs --upstream)")
+    parser.add_argument("--upstream", help="real /api/chat URL to proxy to while recording")
+    parser.add_argument("--replay", help="serve the responses recorded in this JSONL file")
+    args = parser.parse_args()
+
+    if bool(args.record) != bool(args.upstream):
+        parser.error("--record and --upstream go together")
+    if args.replay and args.record:
+        parser.error("--replay and --record are exclusive")
+    try:
+        state = MockChatState(latency=args.latency, history_latency_ms=args.history_latency_ms,
+                              reply=args.reply, reply_words=args.reply_words,
+                              token_gap_ms=args.token_gap_ms, errors=args.error,
+                              disconnect_rate=args.disconnect_rate, seed=args.seed,
+                              replay=args.replay, record=args.record, upstream=args.upstream)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = ThreadingHTTPServer((args.host, args.port), MockChatHandler)
+    server.daemon_threads = True
+    server.state = state
+    mode = (f"recording {args.upstream} to {args.record}" if args.record else
+            f"replaying {args.replay}" if args.replay else f"{args.reply} replies, latency {args.latency}")
+    print(f"🧪 Mock chat API listening on http://{args.host}:{args.port}/api/chat ({mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"   requests: {state.requests}, conversations: {len(state.conversations)}")
+        for outcome, count in sorted(state.outcomes.items(), key=str):
+            print(f"   {outcome}: {count}")
+
+if __name__ == "__main__":
+    main()
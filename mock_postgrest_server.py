@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Local PostgREST-style stand-in for seeding scripts.
+Serves the subset of the Supabase REST and auth admin APIs that
+add_mock_data.py uses, keeps rows in memory, and can inject failures and
+latency so retry and backpressure paths can be exercised without touching a
+real project.
+
+Tables with a UNIQUE constraint in the migrations (daily_entries on
+user_id, date, time_of_day) enforce it: a plain insert that repeats a key
+fails as a whole with 409 / 23505, and an upsert must name that constraint
+in on_conflict, as on the real database.
+
+Usage:
+    python mock_postgrest_server.py --port 54321 --fail-rate 0.1
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 \
+    SUPABASE_SERVICE_ROLE_KEY=local.stand.in python add_mock_data.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# UNIQUE constraints of the real tables (supabase/migrations)
+UNIQUE_KEYS = {
+    "daily_entries": ("user_id", "date", "time_of_day"),
+}
+
+class PostgrestError(Exception):
+    """A request the real database would reject; carries the HTTP status and PostgREST error body"""
+
+    def __init__(self, status, code, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = {"code": code, "details": details, "hint": None, "message": message}
+
+class MockPostgrestState:
+    """In-memory tables plus failure-injection settings shared by all requests"""
+
+    def __init__(self, fail_rate=0.0, seed=None, users=0, user_emails=(),
+                 latency_ms=0.0, jitter_ms=0.0, load_latency_ms=0.0):
+        self.fail_rate = fail_rate
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.load_latency_ms = load_latency_ms
+        self.random = random.Random(seed)
+        self.tables = {}
+        self.key_indexes = {}
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.user_pages_served = 0
+        self.lock = threading.Lock()
+        emails = list(user_emails) + [f"user{i}@example.com" for i in range(users)]
+        self.users = [
+            {
+                "id": str(uuid.UUID(int=self.random.getrandbits(128), version=4)),
+                "email": email,
+                "aud": "authenticated",
+                "role": "authenticated",
+                "app_metadata": {},
+                "user_metadata": {},
+                "created_at": "2025-01-01T00:00:00Z",
+            }
+            for email in emails
+        ]
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            if self.fail_rate and self.random.random() < self.fail_rate:
+                self.failures += 1
+                return True
+            return False
+
+    def write_delay(self):
+        """Seconds to hold a write: base + jitter + a per-concurrent-request penalty"""
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            jitter = self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            return (self.latency_ms + jitter + self.load_latency_ms * (self.in_flight - 1)) / 1000
+
+    def write_done(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def _positions(self, table, key_columns):
+        """{key: row index} for table; call with the lock held"""
+        positions = self.key_indexes.get((table, key_columns))
+        if positions is None:
+            positions = {tuple(row.get(k) for k in key_columns): i
+                         for i, row in enumerate(self.tables.get(table, ()))}
+            self.key_indexes[(table, key_columns)] = positions
+        return positions
+
+    def insert(self, table, rows):
+        """Append rows; the whole request fails if one repeats a unique key"""
+        unique = UNIQUE_KEYS.get(table)
+        with self.lock:
+            existing = self.tables.setdefault(table, [])
+            if unique:
+                positions = self._positions(table, unique)
+                added = {}
+                for row in rows:
+                    key = tuple(row.get(k) for k in unique)
+                    # NULLs never conflict in a UNIQUE constraint
+                    if None in key:
+                        continue
+                    if key in positions or key in added:
+                        raise PostgrestError(
+                            409, "23505",
+                            f'duplicate key value violates unique constraint "{table}_{"_".join(unique)}_key"',
+                            f"Key ({', '.join(unique)})=({', '.join(map(str, key))}) already exists.")
+                    added[key] = len(existing) + len(added)
+            existing.extend(rows)
+            self.key_indexes = {k: v for k, v in self.key_indexes.items() if k[0] != table}
+            if unique:
+                positions.update(added)
+                self.key_indexes[(table, unique)] = positions
+        return rows
+
+    def upsert(self, table, rows, key_columns):
+        """Merge rows into table, replacing any row with the same key columns"""
+        key_columns = tuple(key_columns)
+        unique = UNIQUE_KEYS.get(table)
+        if unique and set(key_columns) != set(unique):
+            raise PostgrestError(400, "42P10", "there is no unique or exclusion constraint "
+                                               "matching the ON CONFLICT specification")
+        with self.lock:
+            existing = self.tables.setdefault(table, [])
+            positions = self._positions(table, key_columns)
+            for row in rows:
+                key = tuple(row.get(k) for k in key_columns)
+                if key in positions:
+                    existing[positions[key]] = {**existing[positions[key]], **row}
+                else:
+                    positions[key] = len(existing)
+                    existing.append(row)
+        return rows
+
+class MockPostgrestHandler(BaseHTTPRequestHandler):
+    """Request handler; the server's `state` attribute holds the data"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this the body waits for
+    # the client's delayed ACK (~40 ms) on a reused connection
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        state = self.server.state
+        parsed = urlparse(self.path)
+        if parsed.path != "/auth/v1/admin/users":
+            self._send_json(404, {"message": f"no route for {parsed.path}"})
+            return
+        query = parse_qs(parsed.query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["50"])[0])
+        start = (page - 1) * per_page
+        with state.lock:
+            state.user_pages_served += 1
+        self._send_json(200, {"users": state.users[start:start + per_page], "aud": "authenticated"})
+
+    def do_POST(self):
+        state = self.server.state
+        parsed = urlparse(self.path)
+        path = parsed.path
+        body = self._read_json()
+        if not path.startswith("/rest/v1/"):
+            self._send_json(404, {"message": f"no route for {path}"})
+            return
+        delay = state.write_delay()
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            if state.should_fail():
+                self._send_json(503, {"code": "PGRST000", "message": "injected failure"})
+                return
+            table = path[len("/rest/v1/"):]
+            rows = body if isinstance(body, list) else [body]
+            on_conflict = parse_qs(parsed.query).get("on_conflict")
+            if on_conflict and "resolution=merge-duplicates" in (self.headers.get("Prefer") or ""):
+                inserted = state.upsert(table, rows, on_conflict[0].split(","))
+            else:
+                inserted = state.insert(table, rows)
+        except PostgrestError as e:
+            self._send_json(e.status, e.payload)
+            return
+        finally:
+            state.write_done()
+        if "return=minimal" in (self.headers.get("Prefer") or ""):
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._send_json(201, inserted)
+
+def start_server(host="127.0.0.1", port=0, **state_options):
+    """Start the stand-in on a background thread and return the server"""
+    server = ThreadingHTTPServer((host, port), MockPostgrestHandler)
+    server.daemon_threads = True
+    server.state = MockPostgrestState(**state_options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Local PostgREST-style stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="fraction of write requests answered with 503")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="base delay added to every write")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="extra uniform random delay per write")
+    parser.add_argument("--load-latency-ms", type=float, default=0.0,
+                        help="extra delay per other write in flight, to simulate a server slowing under load")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--users", type=int, default=0,
+                        help="number of generated auth users (userN@example.com)")
+    parser.add_argument("--user-email", action="append", default=[],
+                        help="extra auth user email; may be repeated")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockPostgrestHandler)
+    server.state = MockPostgrestState(fail_rate=args.fail_rate, seed=args.seed,
+                                      users=args.users, user_emails=args.user_email,
+                                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                      load_latency_ms=args.load_latency_ms)
+    print(f"🧪 Mock PostgREST listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for table, rows in server.state.tables.items():
+            print(f"   {table}: {len(rows)} rows")
+        print(f"   peak concurrent writes: {server.state.max_in_flight}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Checkpoint file for resumable seed jobs.
+Records how many leading rows of a seed job are known to be committed, so an
+interrupted run can skip them. Seeding is done with upserts on the natural key
+(user_id, date, time_of_day), so resending a batch whose commit was not yet
+recorded is harmless.
+"""
+
+import hashlib
+import json
+import os
+
+NATURAL_KEY = ('user_id', 'date', 'time_of_day')
+ON_CONFLICT = ','.join(NATURAL_KEY)
+
+def job_fingerprint(*parts):
+    """Stable id for a seed job, built from anything that determines its rows"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+def entries_fingerprint(entries):
+    """Job id for an explicit list of entries, from their natural keys in order"""
+    return job_fingerprint(*(tuple(entry[k] for k in NATURAL_KEY) for entry in entries))
+
+class SeedCheckpoint:
+    """Committed-row watermark for one seed job, saved after every batch.
+
+    Batches may finish out of order (async seeding); the watermark only moves
+    past a batch once every batch before it has been committed too.
+    """
+
+    def __init__(self, path, job_id):
+        """Load the checkpoint at `path`; raises ValueError if it is valid JSON of the wrong shape"""
+        self.path = path
+        self.job_id = job_id
+        self.committed_rows = 0
+        self.pending = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+            return
+        if not isinstance(data, dict):
+            raise ValueError(f"Corrupt checkpoint {path}: expected a JSON object, "
+                             f"found {type(data).__name__}")
+        if data.get('job_id') != job_id:
+            print(f"⚠️ Checkpoint {path} belongs to a different seed job; starting from the beginning")
+            return
+        committed_rows = data.get('committed_rows', 0)
+        if type(committed_rows) is not int or committed_rows < 0:
+            raise ValueError(f"Corrupt checkpoint {path}: committed_rows is {committed_rows!r}")
+        self.committed_rows = committed_rows
+
+    def mark_committed(self, start, count):
+        """Record rows [start, start + count) as committed and save if the watermark moved"""
+        self.pending[start] = count
+        moved = False
+        while self.committed_rows in self.pending:
+            self.committed_rows += self.pending.pop(self.committed_rows)
+            moved = True
+        if moved:
+            self.save()
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'job_id': self.job_id, 'committed_rows': self.committed_rows}, f)
+        os.replace(tmp_path, self.path)
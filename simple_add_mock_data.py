@@ -4,70 +4,119 @@ Simple script to add mock journal data for ענבל (inbald@sapir.ac.il)
 This script adds 15 diverse journal entries with various symptoms, moods, and sleep quality.
 """
 
+import argparse
 import json
 import os
 import sys
 from datetime import datetime
+from itertools import islice
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def load_mock_data():
-    """Load mock data from JSON file"""
+from journal_entries import iter_batches
+from journal_patterns import PatternEngine, describe
+from journal_stream import JournalStream
+from journal_summary import JournalSummary, stale_sections
+
+# Exports larger than this are streamed rather than loaded with json.load
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+DETECTED_PATTERNS_SHOWN = 5
+
+def load_mock_data(path='mock_journal_data.json', stream=None):
+    """Load mock data from JSON file.
+
+    With stream=True (the default for files over STREAM_THRESHOLD_BYTES) a
+    JournalStream is returned instead, which reads entries incrementally.
+    """
     try:
-        with open('mock_journal_data.json', 'r', encoding='utf-8') as f:
+        if stream is None:
+            stream = os.path.getsize(path) > STREAM_THRESHOLD_BYTES
+        if stream:
+            return JournalStream(path)
+        with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return data
     except FileNotFoundError:
-        print("Error: mock_journal_data.json not found")
+        print(f"Error: {path} not found")
         return None
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}")
         return None
 
 def print_data_summary(data):
-    """Print a summary of the mock data"""
+    """Print a summary of the mock data, computed from the entries if the stored one is missing or stale"""
     if not data:
         return
     
+    # Summarize first: a streamed export then picks up metadata stored after the entries on the same pass
+    computed = None
+    detected = []
+    if 'entries' in data:
+        totals, engine = JournalSummary(), PatternEngine()
+        for batch in iter_batches(data['entries']):
+            totals.update(batch)
+            engine.update(batch)
+        computed = totals.as_dict()
+        detected = [describe(rule) for rule in engine.patterns()[:DETECTED_PATTERNS_SHOWN]]
+    summary = data.get('summary')
+    if computed:
+        stale = stale_sections(summary, computed)
+        if stale:
+            if summary:
+                print(f"⚠️ Stored summary is out of date ({', '.join(stale)}); showing stats computed from the entries")
+            summary = {**(summary or {}), **computed}
+    if not summary:
+        return
+    
+    date_range = data.get('date_range')
+    if not date_range and summary.get('first_date'):
+        date_range = f"{summary['first_date']} to {summary['last_date']}"
     print("📊 Mock Journal Data Summary:")
-    print(f"   User: {data['user_email']}")
-    print(f"   Entries: {data['entries_count']}")
-    print(f"   Date Range: {data['date_range']}")
+    print(f"   User: {data.get('user_email', 'all users')}")
+    print(f"   Entries: {data.get('entries_count', summary.get('total_entries'))}")
+    print(f"   Date Range: {date_range}")
     print()
     
     print("🌙 Sleep Quality Distribution:")
-    for quality, count in data['summary']['sleep_quality_distribution'].items():
+    for quality, count in summary['sleep_quality_distribution'].items():
         print(f"   {quality}: {count} entries")
     print()
     
     print("😊 Mood Distribution:")
-    for mood, count in data['summary']['mood_distribution'].items():
+    for mood, count in summary['mood_distribution'].items():
         print(f"   {mood}: {count} entries")
     print()
     
     print("🔥 Symptoms Frequency:")
-    for symptom, count in data['summary']['symptoms_frequency'].items():
+    for symptom, count in summary['symptoms_frequency'].items():
         print(f"   {symptom}: {count} entries")
     print()
     
     print("⚡ Energy Levels:")
-    for level, count in data['summary']['energy_levels'].items():
+    for level, count in summary['energy_levels'].items():
         print(f"   {level}: {count} entries")
     print()
     
-    print("🎯 Interesting Patterns:")
-    for pattern in data['summary']['interesting_patterns']:
-        print(f"   • {pattern}")
-    print()
+    if summary.get('interesting_patterns'):
+        print("🎯 Interesting Patterns:")
+        for pattern in summary['interesting_patterns']:
+            print(f"   • {pattern}")
+        print()
+    
+    if detected:
+        print("🔎 Detected Patterns:")
+        for pattern in detected:
+            print(f"   • {pattern}")
+        print()
 
 def show_sample_entries(data, count=3):
     """Show sample entries"""
-    if not data or not data.get('entries'):
+    if not data or 'entries' not in data:
         return
     
     print(f"📝 Sample Entries (first {count}):")
-    for i, entry in enumerate(data['entries'][:count]):
+    for i, entry in enumerate(islice(data['entries'], count)):
         print(f"\n   Entry {i+1}: {entry['date']} {entry['time_of_day']}")
         print(f"   Sleep: {entry['sleep_quality']} | Mood: {entry['mood']} | Energy: {entry['energy_level']}")
         print(f"   Symptoms: ", end="")
@@ -84,20 +133,31 @@ def show_sample_entries(data, count=3):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Show the mock journal data")
+    parser.add_argument('--file', default='mock_journal_data.json', help="journal export to read")
+    parser.add_argument('--stream', action='store_true', default=None,
+                        help="read entries incrementally instead of loading the whole file")
+    args = parser.parse_args()
+    
     print("🌸 Mock Journal Data for ענבל (inbald@sapir.ac.il)")
     print("=" * 60)
     
     # Load mock data
-    data = load_mock_data()
+    data = load_mock_data(args.file, args.stream)
     if not data:
         print("❌ Failed to load mock data")
         return
     
-    # Print summary
-    print_data_summary(data)
-    
-    # Show sample entries
-    show_sample_entries(data, 3)
+    try:
+        # Print summary
+        print_data_summary(data)
+        
+        # Show sample entries
+        show_sample_entries(data, 3)
+    except ValueError as e:
+        # Streamed exports are only parsed as they are read
+        print(f"Error parsing JSON: {e}")
+        return
     
     print("\n" + "=" * 60)
     print("📋 Next Steps:")
@@ -2,52 +2,63 @@
 """
 Test script for the chat API
 This script tests the chat API endpoint to diagnose issues
+
+Usage:
+    python test_chat_api.py
+    python test_chat_api.py --stream
+    python test_chat_api.py --load --users 20 --rate 10 --duration 60
 """
 
+import argparse
 import json
 import os
-import urllib.request
-import urllib.parse
-import urllib.error
+import sys
+import time
 from dotenv import load_dotenv
 
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_client import ChatClient, ConnectionPool, print_pool_stats
+from chat_load_test import DEFAULT_DURATION_SECONDS, DEFAULT_USERS, print_report, run_load_test
+from chat_stream_client import DEFAULT_MESSAGE, DEFAULT_URL, DEFAULT_USER_ID, print_timing
+
 # Load environment variables
 load_dotenv()
 
-def test_chat_api():
+def test_chat_api(api_url=DEFAULT_URL, repeat=1, client=None):
     """Test the chat API endpoint"""
     
+    client = client or ChatClient()
+    
     print("🧪 Testing Chat API...")
     print("=" * 50)
     
     # Test data
     test_data = {
-        "message": "שלום עליזה",
-        "userId": "test-user-123",
+        "message": DEFAULT_MESSAGE,
+        "userId": DEFAULT_USER_ID,
         "conversationId": None
     }
     
-    # API endpoint
-    api_url = "http://localhost:3000/api/chat"
-    
     print(f"📡 Testing API: {api_url}")
     print(f"📝 Test message: {test_data['message']}")
     print()
     
     try:
-        # Make request using urllib
-        data = json.dumps(test_data).encode('utf-8')
-        req = urllib.request.Request(
-            api_url,
-            data=data,
-            headers={'Content-Type': 'application/json'}
-        )
+        # Make requests over kept-alive connections
+        for attempt in range(1, repeat + 1):
+            started = time.perf_counter()
+            status, body = client.post_json(api_url, test_data)
+            elapsed = time.perf_counter() - started
+            response_json = json.loads(body.decode('utf-8'))
+            if repeat > 1:
+                print(f"⏱️ Request {attempt}/{repeat}: {status} in {elapsed * 1000:.1f} ms")
+        if repeat > 1:
+            print_pool_stats(client.pool.stats)
+            print()
         
-        with urllib.request.urlopen(req, timeout=30) as response:
-            response_text = response.read().decode('utf-8')
-            response_json = json.loads(response_text)
-        
-        print(f"📊 Response Status: {response.status}")
+        print(f"📊 Response Status: {status}")
         print()
         
         # Check if response is JSON
@@ -60,13 +71,13 @@ def test_chat_api():
         else:
             print("✅ API call successful")
             
-    except urllib.error.URLError as e:
-        if "Connection refused" in str(e):
-            print("❌ Connection Error: Cannot connect to server")
-            print("💡 Make sure the server is running on localhost:3000")
-            print("   Run: npm run dev")
-        else:
-            print(f"❌ URL Error: {e}")
+    except ConnectionRefusedError:
+        print("❌ Connection Error: Cannot connect to server")
+        print("💡 Make sure the server is running on localhost:3000")
+        print("   Run: npm run dev")
+        
+    except OSError as e:
+        print(f"❌ Connection Error: {e}")
             
     except json.JSONDecodeError as e:
         print(f"❌ Response is not JSON: {e}")
@@ -117,8 +128,95 @@ def check_environment():
         print("❌ .env.local file not found")
         print("💡 Create .env.local with required variables")
 
+def test_chat_api_streaming(api_url=DEFAULT_URL, repeat=1, client=None):
+    """Test the chat API endpoint, reading the reply as it streams in"""
+    
+    client = client or ChatClient()
+    
+    print("🧪 Testing Chat API (streaming)...")
+    print("=" * 50)
+    
+    test_data = {
+        "message": DEFAULT_MESSAGE,
+        "userId": DEFAULT_USER_ID,
+        "conversationId": None
+    }
+    
+    print(f"📡 Testing API: {api_url}")
+    print(f"📝 Test message: {test_data['message']}")
+    print()
+    
+    try:
+        for attempt in range(1, repeat + 1):
+            timing = client.stream_chat(api_url, test_data)
+            if repeat > 1:
+                print(f"⏱️ Request {attempt}/{repeat}: connect {timing.connect * 1000:.1f} ms, "
+                      f"first token {(timing.first_token or 0) * 1000:.1f} ms, "
+                      f"total {timing.total * 1000:.1f} ms")
+        if repeat > 1:
+            print_pool_stats(client.pool.stats)
+            print()
+        print_timing(timing)
+        if timing.error is None:
+            print("✅ API call successful")
+    except ConnectionRefusedError:
+        print("❌ Connection Error: Cannot connect to server")
+        print("💡 Make sure the server is running on localhost:3000")
+        print("   Run: npm run dev")
+    except Exception as e:
+        print(f"❌ Unexpected Error: {e}")
+
+def load_test_chat_api(api_url, users, rate, duration, requests):
+    """Run the chat API under concurrent load and report latency percentiles"""
+    
+    print("🏋️ Load Testing Chat API...")
+    print("=" * 50)
+    
+    test_data = {
+        "message": DEFAULT_MESSAGE,
+        "userId": DEFAULT_USER_ID,
+        "conversationId": None
+    }
+    if duration is None and requests is None:
+        duration = DEFAULT_DURATION_SECONDS
+    
+    print(f"📡 Testing API: {api_url}")
+    print(f"👥 Virtual users: {users}, target rate: {f'{rate:g} req/s' if rate else 'unpaced'}")
+    print()
+    
+    # One kept-alive connection per virtual user
+    with ChatClient(ConnectionPool(max_per_host=users)) as client:
+        result = run_load_test(lambda: client.post_json(api_url, test_data),
+                               users=users, rate=rate, duration=duration, requests=requests)
+        print_report(result)
+        print_pool_stats(client.pool.stats)
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Chat API diagnostic tool")
+    parser.add_argument('--url', default=DEFAULT_URL, help="chat API endpoint")
+    parser.add_argument('--stream', action='store_true',
+                        help="read the reply incrementally and time connect, first byte and tokens")
+    parser.add_argument('--repeat', type=positive_int, default=1,
+                        help="send the test message this many times over kept-alive connections")
+    parser.add_argument('--load', action='store_true', help="run a concurrent load test instead")
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help="load test: concurrent virtual users")
+    parser.add_argument('--rate', type=float, help="load test: target requests per second")
+    parser.add_argument('--duration', type=float, help="load test: seconds to run")
+    parser.add_argument('--requests', type=int, help="load test: total requests to send")
+    args = parser.parse_args()
+    
+    if args.load:
+        load_test_chat_api(args.url, args.users, args.rate, args.duration, args.requests)
+        return
+    
     print("🌸 Chat API Diagnostic Tool")
     print("=" * 50)
     print()
@@ -128,7 +226,11 @@ def main():
     print()
     
     # Test API
-    test_chat_api()
+    with ChatClient() as client:
+        if args.stream:
+            test_chat_api_streaming(args.url, args.repeat, client)
+        else:
+            test_chat_api(args.url, args.repeat, client)
     
     print()
     print("🎯 Next Steps:")